@@ -1,25 +1,46 @@
 import streamlit as st
+import io
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
 from typing import Dict, List, Any
 from datetime import datetime
 from analytics_error_handler import safe_track
 
+SCORE_FIELDS = ("technical_score", "behavioral_score", "communication_score", "confidence_score", "experience_alignment")
+EMOTIONS = ("Confident", "Nervous", "Enthusiastic", "Calm")
+# One row per answer: points each score gained on that answer, emotion code and seconds since start
+SERIES_COLUMNS = tuple(f"{field}_gain" for field in SCORE_FIELDS) + ("emotion_code", "elapsed_seconds")
+HISTORY_SIZE = 32  # answers kept in the ring buffer; older rows only live on in the aggregates
+MOVING_AVERAGE_WINDOW = 3
+
 class InterviewAnalytics:
-    def __init__(self):
+    def __init__(self, history_size: int = HISTORY_SIZE):
+        self._lock = threading.RLock()
+        self.history_size = history_size
         self.initialize_metrics()
     
     def initialize_metrics(self):
         """Initialize or reset analytics metrics"""
-        self.metrics = {
-            "emotion": [],
-            "technical_score": 0,
-            "behavioral_score": 0,
-            "communication_score": 0,
-            "confidence_score": 0,
-            "experience_alignment": 0,
-            "interview_duration": 0,
-            "questions_answered": 0,
-            "start_time": datetime.now()
-        }
+        with self._lock:
+            self.metrics = {field: 0 for field in SCORE_FIELDS}
+            self.metrics.update({
+                "interview_duration": 0,
+                "questions_answered": 0,
+                "start_time": datetime.now()
+            })
+            self.series = np.zeros((self.history_size, len(SERIES_COLUMNS)), dtype=np.float32)
+            self.rows_recorded = 0
+            # Scores as of the previous answer, so each row holds that answer's gains
+            self._last_recorded = np.zeros(len(SCORE_FIELDS), dtype=np.float64)
+            # Incrementally maintained aggregates
+            self._window_sum = np.zeros(len(SCORE_FIELDS), dtype=np.float64)
+            self._trend_sums = np.zeros(5, dtype=np.float64)  # n, sum x, sum y, sum xy, sum xx
+            self.version = 0
+            self._snapshot = None
+            self._snapshot_version = -1
+            self._export_cache = (None, -1)
     
     @safe_track
     def update_scores(self, 
@@ -30,38 +51,168 @@ class InterviewAnalytics:
                      alignment: float = 0):
         """Update interview scores with validation"""
         try:
-            self.metrics["technical_score"] = min(100, max(0, self.metrics["technical_score"] + technical))
-            self.metrics["behavioral_score"] = min(100, max(0, self.metrics["behavioral_score"] + behavioral))
-            self.metrics["communication_score"] = min(100, max(0, self.metrics["communication_score"] + communication))
-            self.metrics["confidence_score"] = min(100, max(0, self.metrics["confidence_score"] + confidence))
-            self.metrics["experience_alignment"] = min(100, max(0, self.metrics["experience_alignment"] + alignment))
+            with self._lock:
+                self.metrics["technical_score"] = min(100, max(0, self.metrics["technical_score"] + technical))
+                self.metrics["behavioral_score"] = min(100, max(0, self.metrics["behavioral_score"] + behavioral))
+                self.metrics["communication_score"] = min(100, max(0, self.metrics["communication_score"] + communication))
+                self.metrics["confidence_score"] = min(100, max(0, self.metrics["confidence_score"] + confidence))
+                self.metrics["experience_alignment"] = min(100, max(0, self.metrics["experience_alignment"] + alignment))
+                self.version += 1
         except Exception as e:
             st.error(f"Error updating scores: {str(e)}")
     
     @safe_track
-    def add_emotion(self, emotion: str):
-        """Add emotion detection result"""
-        if emotion and isinstance(emotion, str):
-            self.metrics["emotion"].append(emotion)
+    def set_alignment(self, alignment: float):
+        """Replace the experience alignment with a freshly computed score"""
+        with self._lock:
+            self.metrics["experience_alignment"] = min(100, max(0, alignment))
+            self.version += 1
     
     @safe_track
-    def increment_questions(self):
-        """Increment questions answered counter"""
-        self.metrics["questions_answered"] += 1
-        self.update_duration()
+    def record_answer(self, emotion: str = None):
+        """Append this answer's score gains as one row and update derived aggregates"""
+        with self._lock:
+            self.update_duration()
+            slot = self.rows_recorded % self.history_size
+            current = np.array([self.metrics[field] for field in SCORE_FIELDS], dtype=np.float64)
+            gains = current - self._last_recorded
+            self._last_recorded = current
+            row = np.array(
+                list(gains) + [EMOTIONS.index(emotion) if emotion in EMOTIONS else -1, self.metrics["interview_duration"]],
+                dtype=np.float32
+            )
+            
+            # Moving average of the gains: add the new row, drop the one that left the window
+            scores = row[:len(SCORE_FIELDS)].astype(np.float64)
+            self._window_sum += scores
+            if self.rows_recorded >= MOVING_AVERAGE_WINDOW:
+                leaving = (self.rows_recorded - MOVING_AVERAGE_WINDOW) % self.history_size
+                self._window_sum -= self.series[leaving, :len(SCORE_FIELDS)]
+            
+            # Least-squares trend of the mean gain per answer, from running sums
+            x, y = float(self.rows_recorded), float(scores.mean())
+            self._trend_sums += (1, x, y, x * y, x * x)
+            
+            self.series[slot] = row
+            self.rows_recorded += 1
+            self.metrics["questions_answered"] += 1
+            self.version += 1
     
     @safe_track
     def update_duration(self):
         """Update interview duration"""
-        current_time = datetime.now()
-        duration = (current_time - self.metrics["start_time"]).total_seconds()
-        self.metrics["interview_duration"] = round(duration)
+        with self._lock:
+            current_time = datetime.now()
+            duration = (current_time - self.metrics["start_time"]).total_seconds()
+            self.metrics["interview_duration"] = round(duration)
     
     @safe_track
     def get_metrics(self) -> Dict[str, Any]:
         """Get current metrics"""
         self.update_duration()
         return self.metrics
+    
+    def _ordered_rows(self) -> np.ndarray:
+        """Rows still in the ring buffer, oldest first"""
+        if self.rows_recorded <= self.history_size:
+            return self.series[:self.rows_recorded]
+        slot = self.rows_recorded % self.history_size
+        return np.concatenate([self.series[slot:], self.series[:slot]])
+    
+    def _trend(self) -> float:
+        n, sx, sy, sxy, sxx = self._trend_sums
+        denominator = n * sxx - sx * sx
+        return float((n * sxy - sx * sy) / denominator) if denominator else 0.0
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Render-ready view of the analytics, rebuilt only after an update"""
+        with self._lock:
+            if self._snapshot_version == self.version:
+                return self._snapshot
+            window = min(self.rows_recorded, MOVING_AVERAGE_WINDOW)
+            moving_average = self._window_sum / window if window else np.zeros(len(SCORE_FIELDS))
+            emotions = [EMOTIONS[int(code)] for code in self._ordered_rows()[:, len(SCORE_FIELDS)] if code >= 0]
+            self._snapshot = {
+                **{field: int(round(self.metrics[field])) for field in SCORE_FIELDS},
+                "moving_average": {field: round(float(value), 1) for field, value in zip(SCORE_FIELDS, moving_average)},
+                "trend": round(self._trend(), 2),
+                "current_emotion": emotions[-1] if emotions else None,
+                "emotion_timeline": ", ".join(emotions),
+                "questions_answered": self.metrics["questions_answered"],
+                "version": self.version
+            }
+            self._snapshot_version = self.version
+            return self._snapshot
+    
+    def to_frame(self):
+        """Per-answer time series as a pandas DataFrame"""
+        import pandas as pd
+        with self._lock:
+            rows = self._ordered_rows().copy()
+            first_answer = self.rows_recorded - len(rows)
+            frame = pd.DataFrame(rows, columns=list(SERIES_COLUMNS))
+        frame.insert(0, "answer_index", np.arange(first_answer, first_answer + len(frame), dtype=np.int32))
+        frame["emotion_code"] = frame["emotion_code"].astype(np.int8)
+        frame["emotion"] = pd.Categorical.from_codes(frame["emotion_code"], categories=list(EMOTIONS))
+        return frame.drop(columns=["emotion_code"])
+    
+    def export_parquet(self, path=None):
+        """Write the analytics snapshot as Parquet to a path, or return the bytes"""
+        if path is not None:
+            self.to_frame().to_parquet(path, index=False)
+            return path
+        with self._lock:
+            data, version = self._export_cache
+            if version == self.version:
+                return data
+        buffer = io.BytesIO()
+        self.to_frame().to_parquet(buffer, index=False)
+        with self._lock:
+            self._export_cache = (buffer.getvalue(), self.version)
+        return buffer.getvalue()
+
+class AnalyticsPool:
+    """Per-session analytics instances, created on first use"""
+    def __init__(self, max_sessions: int = 256, idle_timeout: float = 3600):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = OrderedDict()
+        self._last_used = {}
+        self._lock = threading.Lock()
+    
+    def acquire(self, session_id: str) -> InterviewAnalytics:
+        """Get the analytics owned by a session, creating it on first use"""
+        with self._lock:
+            now = time.monotonic()
+            analytics = self._sessions.get(session_id)
+            if analytics is None:
+                # Created here rather than at import so start_time is per interview
+                analytics = InterviewAnalytics()
+                self._sessions[session_id] = analytics
+            else:
+                self._sessions.move_to_end(session_id)
+            self._last_used[session_id] = now
+            # Idle sessions go first; the size cap only applies to recently active ones
+            while len(self._sessions) > 1:
+                oldest_id = next(iter(self._sessions))
+                if now - self._last_used[oldest_id] < self.idle_timeout and len(self._sessions) <= self.max_sessions:
+                    break
+                self._sessions.pop(oldest_id)
+                self._last_used.pop(oldest_id)
+            return analytics
+    
+    def release(self, session_id: str):
+        """Drop the analytics of a session"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._last_used.pop(session_id, None)
+
+# Shared pool handing out one analytics instance per session
+analytics_pool = AnalyticsPool()
 
-# Global analytics instance
-analytics = InterviewAnalytics()
\ No newline at end of file
+def get_session_analytics(session_id: str = None) -> InterviewAnalytics:
+    """Get the analytics for the current Streamlit session"""
+    if session_id is None:
+        from state_management import get_session_id
+        session_id = get_session_id()
+    return analytics_pool.acquire(session_id)
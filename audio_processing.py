@@ -0,0 +1,184 @@
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Tuple
+
+import numpy as np
+
+# What each consumer expects
+STT_SAMPLE_RATE = 16000
+BROWSER_SAMPLE_RATE = 24000  # a native Opus rate and gTTS's own output rate
+BROWSER_FORMATS = {
+    "opus": ("OGG", "OPUS", "audio/ogg"),
+    "mp3": ("MP3", "MPEG_LAYER_III", "audio/mpeg"),
+    "wav": ("WAV", "PCM_16", "audio/wav")
+}
+
+# Low-pass filter length used before downsampling
+FILTER_TAPS = 63
+
+def to_mono(samples: np.ndarray) -> np.ndarray:
+    """Down-mix (frames, channels) audio to one channel"""
+    if samples.ndim == 1:
+        return samples
+    return samples.mean(axis=1, dtype=np.float32)
+
+def normalize(samples: np.ndarray, peak: float = 0.9) -> np.ndarray:
+    """Scale audio so its loudest sample sits at the given peak"""
+    loudest = float(np.abs(samples).max()) if len(samples) else 0.0
+    if loudest < 1e-6:
+        return samples
+    return samples * np.float32(peak / loudest)
+
+def _lowpass(samples: np.ndarray, cutoff: float) -> np.ndarray:
+    """Windowed-sinc low-pass; cutoff is a fraction of the sample rate"""
+    n = np.arange(FILTER_TAPS) - (FILTER_TAPS - 1) / 2
+    taps = np.sinc(2 * cutoff * n) * np.hamming(FILTER_TAPS)
+    taps /= taps.sum()
+    return np.convolve(samples, taps.astype(np.float32), mode="same")
+
+def resample(samples: np.ndarray, orig_rate: int, target_rate: int) -> np.ndarray:
+    """Resample mono float audio with an anti-aliasing filter when downsampling"""
+    if orig_rate == target_rate or not len(samples):
+        return samples.astype(np.float32, copy=False)
+    if target_rate < orig_rate:
+        samples = _lowpass(samples, 0.5 * target_rate / orig_rate)
+    duration = len(samples) / orig_rate
+    target_positions = np.arange(int(duration * target_rate)) * (orig_rate / target_rate)
+    return np.interp(target_positions, np.arange(len(samples)), samples).astype(np.float32)
+
+def decode_audio(data: bytes) -> Tuple[np.ndarray, int]:
+    """Decode WAV/FLAC/OGG/MP3 bytes to float32 samples"""
+    import soundfile as sf
+    samples, rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=False)
+    return samples, rate
+
+def encode_audio(samples: np.ndarray, rate: int, file_format: str, subtype: str) -> bytes:
+    """Encode float samples with libsndfile"""
+    import soundfile as sf
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, rate, format=file_format, subtype=subtype)
+    return buffer.getvalue()
+
+def encode_pcm16(samples: np.ndarray) -> bytes:
+    """Little-endian 16-bit PCM bytes for speech recognition"""
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+def _prepare_for_stt(data: bytes = None, pcm: bytes = None, rate: int = STT_SAMPLE_RATE):
+    if data is not None:
+        samples, rate = decode_audio(data)
+    else:
+        samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768
+    samples = to_mono(samples)
+    audio_seconds = len(samples) / rate
+    samples = normalize(resample(samples, rate, STT_SAMPLE_RATE))
+    return encode_pcm16(samples), audio_seconds
+
+def _prepare_for_browser(data: bytes, target: str = "opus"):
+    samples, rate = decode_audio(data)
+    samples = to_mono(samples)
+    audio_seconds = len(samples) / rate
+    file_format, subtype, _ = BROWSER_FORMATS[target]
+    samples = normalize(resample(samples, rate, BROWSER_SAMPLE_RATE))
+    return encode_audio(samples, BROWSER_SAMPLE_RATE, file_format, subtype), audio_seconds
+
+# Worker entry points return (result, audio seconds processed, CPU seconds spent);
+# they are module-level functions so they can be pickled into worker processes
+def prepare_for_stt_job(**kwargs):
+    started = time.process_time()
+    result, audio_seconds = _prepare_for_stt(**kwargs)
+    return result, audio_seconds, time.process_time() - started
+
+def prepare_for_browser_job(data: bytes, target: str = "opus"):
+    started = time.process_time()
+    result, audio_seconds = _prepare_for_browser(data, target)
+    return result, audio_seconds, time.process_time() - started
+
+class AudioProcessingPool:
+    """Bounded process pool for CPU-heavy audio work"""
+    def __init__(self, max_workers: int = None, max_pending: int = 8):
+        self.max_workers = max_workers or max(1, min(2, (os.cpu_count() or 1) - 1))
+        # Spawned workers do not inherit the Streamlit server's threads
+        self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.stats = {"jobs": 0, "audio_seconds": 0.0, "cpu_seconds": 0.0}
+
+    def run(self, job, *args, timeout: float = 60, **kwargs):
+        """Run a job on the pool, waiting for a free slot first"""
+        with self._slots:
+            result, audio_seconds, cpu_seconds = self._executor.submit(job, *args, **kwargs).result(timeout=timeout)
+        with self._lock:
+            self.stats["jobs"] += 1
+            self.stats["audio_seconds"] += audio_seconds
+            self.stats["cpu_seconds"] += cpu_seconds
+        return result
+
+    def prepare_for_stt(self, data: bytes = None, pcm: bytes = None, rate: int = STT_SAMPLE_RATE) -> bytes:
+        """Decode or take raw PCM and produce normalized 16 kHz mono PCM"""
+        return self.run(prepare_for_stt_job, data=data, pcm=pcm, rate=rate)
+
+    def prepare_for_browser(self, data: bytes, target: str = "opus") -> bytes:
+        """Transcode audio (e.g. gTTS MP3) to the format sent to the browser"""
+        return self.run(prepare_for_browser_job, data, target)
+
+    def throughput(self) -> float:
+        """Audio seconds processed per CPU second"""
+        with self._lock:
+            cpu = self.stats["cpu_seconds"]
+            return self.stats["audio_seconds"] / cpu if cpu else 0.0
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_audio_pool() -> AudioProcessingPool:
+    """Process-wide audio pool, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = AudioProcessingPool()
+        return _pool
+
+def benchmark(seconds: float = 30.0, jobs: int = 8) -> Dict[str, float]:
+    """Measure throughput on synthetic speech-band audio"""
+    rate = 44100
+    t = np.arange(int(seconds * rate)) / rate
+    stereo = np.stack([0.3 * np.sin(2 * np.pi * 220 * t), 0.3 * np.sin(2 * np.pi * 330 * t)], axis=1).astype(np.float32)
+    wav = encode_audio(stereo, rate, "WAV", "PCM_16")
+    mp3 = encode_audio(to_mono(stereo)[: int(10 * rate)], rate, "MP3", "MPEG_LAYER_III")
+
+    pool = AudioProcessingPool()
+    started = time.perf_counter()
+    for _ in range(jobs):
+        pool.prepare_for_stt(data=wav)
+    stt_wall = time.perf_counter() - started
+    stt = pool.throughput()
+
+    pool.stats = {"jobs": 0, "audio_seconds": 0.0, "cpu_seconds": 0.0}
+    started = time.perf_counter()
+    for _ in range(jobs):
+        pool.prepare_for_browser(mp3, "opus")
+    browser_wall = time.perf_counter() - started
+    return {
+        "workers": pool.max_workers,
+        "stt_audio_seconds_per_cpu_second": round(stt, 1),
+        "stt_wall_seconds_per_job": round(stt_wall / jobs, 3),
+        "browser_audio_seconds_per_cpu_second": round(pool.throughput(), 1),
+        "browser_wall_seconds_per_job": round(browser_wall / jobs, 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the audio processing pool")
+    parser.add_argument("command", choices=["bench"])
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--jobs", type=int, default=8)
+    args = parser.parse_args()
+    print(json.dumps(benchmark(args.seconds, args.jobs), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".ogg", ".mp3")
+TRANSCRIPT_EXTENSIONS = (".txt",)
+METADATA_FILE = "metadata.json"
+CHECKPOINT_FILE = "checkpoint.jsonl"
+# Kept apart from the app's store so batch runs never compact the live directory
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "batch_results")
+
+# Question categories that feed each score column; communication and confidence use every answer
+CATEGORY_SCORES = {
+    "technical_score": ("Technical Skills", "Role-specific"),
+    "behavioral_score": ("Introduction", "Behavioral")
+}
+
+def discover_interviews(input_dir: str) -> List[Dict[str, Any]]:
+    """Find interview directories: a metadata.json plus one audio or transcript file per answer.
+
+    metadata.json holds candidate_name, position and skills, and optionally
+    questions (one text or {"category", "main_question"} object per answer file).
+    Answer files are taken in file name order.
+    """
+    interviews = []
+    for name in sorted(os.listdir(input_dir)):
+        directory = os.path.join(input_dir, name)
+        metadata_path = os.path.join(directory, METADATA_FILE)
+        if not os.path.isfile(metadata_path):
+            continue
+        with open(metadata_path, encoding="utf-8") as f:
+            metadata = json.load(f)
+        answers = [
+            os.path.join(directory, file_name) for file_name in sorted(os.listdir(directory))
+            if file_name.lower().endswith(AUDIO_EXTENSIONS + TRANSCRIPT_EXTENSIONS)
+        ]
+        if answers:
+            interviews.append({"interview_id": metadata.get("interview_id", name), "metadata": metadata, "answers": answers})
+    return interviews
+
+def transcribe_answer(path: str) -> Tuple[str, float]:
+    """Worker entry point: (transcript, audio seconds) for one answer file"""
+    if path.lower().endswith(TRANSCRIPT_EXTENSIONS):
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip(), 0.0
+    import speech_recognition as sr
+    from audio_processing import prepare_for_stt_job, STT_SAMPLE_RATE
+    from speech_utils import recognizer_pool
+    with open(path, "rb") as f:
+        pcm, audio_seconds, _ = prepare_for_stt_job(data=f.read())
+    # Each worker process keeps one recognizer for all of its files
+    recognizer = recognizer_pool.acquire(f"batch-{os.getpid()}")
+    try:
+        return recognizer.recognize_google(sr.AudioData(pcm, STT_SAMPLE_RATE, 2)), audio_seconds
+    except sr.UnknownValueError:
+        return "", audio_seconds
+
+class Checkpoint:
+    """Append-only log of interviews already written to the results store, per evaluation variant"""
+    def __init__(self, path: str, variant: str = ""):
+        self.path = path
+        self.variant = variant
+        self.done = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    # A torn last line from an interrupted run is ignored
+                    try:
+                        entry = json.loads(line)
+                        if entry.get("variant", "") == variant:
+                            self.done.add(entry["interview_id"])
+                    except (ValueError, KeyError):
+                        pass
+
+    def mark(self, interview_ids: List[str]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for interview_id in interview_ids:
+                f.write(json.dumps({"interview_id": interview_id, "variant": self.variant,
+                                    "completed_at": time.time()}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.update(interview_ids)
+
+def _question_for(metadata: Dict[str, Any], index: int) -> Dict[str, Optional[str]]:
+    questions = metadata.get("questions") or []
+    question = questions[index] if index < len(questions) else None
+    if isinstance(question, dict):
+        return {"category": question.get("category"), "main_question": question.get("main_question")}
+    return {"category": None, "main_question": question or f"Question {index + 1}"}
+
+def score_interview(question_records: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Score columns (0-100) from the per-question summary scores"""
+    def mean(records):
+        scores = [record["score"] for record in records if record.get("score") is not None]
+        return round(sum(scores) / len(scores) * 10, 1) if scores else 0.0
+    overall = mean(question_records)
+    scores = {"communication_score": overall, "confidence_score": overall}
+    for column, categories in CATEGORY_SCORES.items():
+        matching = [record for record in question_records if record.get("category") in categories]
+        scores[column] = mean(matching) if matching else overall
+    return scores
+
+class BatchEvaluator:
+    """STT on a process pool and LLM evaluation with bounded async concurrency.
+
+    prompt_revision and model pick the summary prompt version and model, so
+    two variants can be run over the same interviews and compared.
+    """
+    def __init__(self, workers: int = None, concurrency: int = 8, prompt_revision: Optional[int] = None,
+                 model: Optional[str] = None):
+        from prompts import registry
+        self.workers = workers or os.cpu_count() or 1
+        self.concurrency = concurrency
+        self.summary_prompt = registry.get("question_summary", prompt_revision)
+        if model is None:
+            from llm_utils import SUMMARY_MODEL
+            model = SUMMARY_MODEL
+        self.summary_model = model
+        self.stats = {"interviews": 0, "failed": 0, "answers": 0, "audio_seconds": 0.0,
+                      "stt_seconds": 0.0, "llm_seconds": 0.0, "failed_summaries": 0}
+
+    @property
+    def variant(self) -> str:
+        """Identifies the prompt version and model in checkpoints"""
+        return f"{self.summary_prompt.version}/{self.summary_model}"
+
+    async def _summarize(self, client, semaphore, question, exchange, skills):
+        from llm_utils import summarize_question_exchange_async
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                return await summarize_question_exchange_async(client, question, exchange, skills,
+                                                               self.summary_prompt, self.summary_model)
+            except Exception as e:
+                # A fallback record has no score, so the interview fails and is retried by the next run
+                self.stats["failed_summaries"] += 1
+                raise RuntimeError(f"summary of {question!r} failed: {e}") from e
+            finally:
+                self.stats["llm_seconds"] += time.perf_counter() - started
+
+    async def evaluate(self, interview: Dict[str, Any], pool, client, semaphore) -> Dict[str, Any]:
+        """Transcribe and evaluate one interview into a results store record"""
+        from skill_index import experience_alignment
+        loop = asyncio.get_running_loop()
+        metadata = interview["metadata"]
+        skills = metadata.get("skills") or []
+
+        started = time.perf_counter()
+        transcripts = await asyncio.gather(*(
+            loop.run_in_executor(pool, transcribe_answer, path) for path in interview["answers"]
+        ))
+        self.stats["stt_seconds"] += time.perf_counter() - started
+
+        exchanges = []
+        for index, (text, audio_seconds) in enumerate(transcripts):
+            self.stats["audio_seconds"] += audio_seconds
+            question = _question_for(metadata, index)
+            exchanges.append((question, [
+                {"role": "assistant", "content": question["main_question"]},
+                {"role": "user", "content": text}
+            ]))
+        summaries = await asyncio.gather(*(
+            self._summarize(client, semaphore, question["main_question"], exchange, skills)
+            for question, exchange in exchanges
+        ))
+
+        question_records = []
+        for index, ((question, exchange), summary) in enumerate(zip(exchanges, summaries)):
+            record = {"question_index": index, "category": question["category"],
+                      "question": question["main_question"], "exchange_count": len(exchange)}
+            record.update(summary)
+            question_records.append(record)
+        answers = [text for text, _ in transcripts]
+        record = {
+            "interview_id": interview["interview_id"],
+            "candidate_name": metadata.get("candidate_name", ""),
+            "position": metadata.get("position", ""),
+            "skills": skills,
+            "questions_answered": sum(1 for text in answers if text),
+            "duration_seconds": metadata.get("duration_seconds", sum(seconds for _, seconds in transcripts)),
+            "transcript": [message for _, exchange in exchanges for message in exchange],
+            "questions": {"questions": [question for question, _ in exchanges]},
+            "question_records": question_records,
+            "experience_alignment": experience_alignment(answers, skills) or 0,
+            "summary_prompt_version": self.summary_prompt.version,
+            "summary_model": self.summary_model
+        }
+        record.update(score_interview(question_records))
+        self.stats["answers"] += len(answers)
+        return record
+
+    async def run(self, interviews: List[Dict[str, Any]], store, checkpoint: Checkpoint, batch_size: int = 32):
+        """Evaluate interviews in batches, writing and checkpointing each batch in bulk"""
+        from llm_utils import get_async_client
+        client = get_async_client()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # Spawned workers do not inherit this process's event loop or threads
+        with ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            for start in range(0, len(interviews), batch_size):
+                batch = interviews[start:start + batch_size]
+                results = await asyncio.gather(
+                    *(self.evaluate(interview, pool, client, semaphore) for interview in batch),
+                    return_exceptions=True
+                )
+                written = []
+                # Read before submitting, so a failure of this batch's write is always seen
+                failed_before = store.failed_records
+                for interview, result in zip(batch, results):
+                    if isinstance(result, Exception):
+                        # Not checkpointed, so the next run retries it
+                        self.stats["failed"] += 1
+                        print(f"Failed to evaluate {interview['interview_id']}: {result}", file=sys.stderr)
+                        continue
+                    store.submit(result)
+                    written.append(interview["interview_id"])
+                # Only checkpoint what the store has durably written
+                if written and store.flush() and store.failed_records == failed_before:
+                    checkpoint.mark(written)
+                    self.stats["interviews"] += len(written)
+                print(f"{len(checkpoint.done)} interviews done", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate recorded interviews offline")
+    parser.add_argument("input_dir", help="directory with one sub-directory per interview")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help="results store directory (default: batch_results/)")
+    parser.add_argument("--workers", type=int, default=None, help="STT worker processes (default: CPU count)")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent LLM requests")
+    parser.add_argument("--batch-size", type=int, default=32, help="interviews written and checkpointed together")
+    parser.add_argument("--limit", type=int, default=None, help="evaluate at most this many pending interviews")
+    parser.add_argument("--prompt-version", type=int, default=None,
+                        help="question_summary prompt version to evaluate with (default: newest)")
+    parser.add_argument("--model", default=None, help="summary model (default: the app's summary model)")
+    args = parser.parse_args()
+
+    from results_store import InterviewResultsStore
+    # The batch size also bounds the writer's buffer, so each batch becomes one part file
+    store = InterviewResultsStore(args.output, batch_size=args.batch_size, flush_interval=1.0, max_pending=args.batch_size * 2)
+    evaluator = BatchEvaluator(args.workers, args.concurrency, args.prompt_version, args.model)
+    # Each variant keeps its own progress, so a second variant re-evaluates every interview
+    checkpoint = Checkpoint(os.path.join(args.output, CHECKPOINT_FILE), evaluator.variant)
+    pending = [interview for interview in discover_interviews(args.input_dir) if interview["interview_id"] not in checkpoint.done]
+    if args.limit is not None:
+        pending = pending[:args.limit]
+
+    started = time.perf_counter()
+    asyncio.run(evaluator.run(pending, store, checkpoint, args.batch_size))
+    elapsed = time.perf_counter() - started
+    summary = dict(evaluator.stats, wall_seconds=round(elapsed, 1), workers=evaluator.workers,
+                   summary_prompt_version=evaluator.summary_prompt.version, summary_model=evaluator.summary_model,
+                   interviews_per_minute=round(evaluator.stats["interviews"] / elapsed * 60, 1) if elapsed else 0.0)
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+import streamlit as st
+import streamlit.components.v1 as components
+import numpy as np
+import json
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Callable, Dict, Any, Optional, Tuple
+
+# Browser-side recorder; it streams 16 kHz mu-law packets while the candidate speaks
+_FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "audio_capture_frontend")
+_audio_capture_component = components.declare_component("audio_capture", path=_FRONTEND_DIR)
+
+SAMPLE_WIDTH = 2  # bytes per sample once decoded to pcm_s16le
+CHUNK_SAMPLES = 4000  # 250 ms at 16 kHz; the unit the pipeline queue holds
+# Shorter phrases are merged with the next one rather than sent to STT alone
+MIN_PHRASE_SECONDS = 1.0
+_HEADER_LENGTH = struct.Struct(">I")
+
+def browser_audio_capture(key: str, ack: Optional[Dict[str, Any]] = None) -> Optional[bytes]:
+    """Render the in-browser recorder and return the latest packet.
+
+    ack tells the browser which packet the server has finished with; it holds
+    back further packets until then, so a slow server throttles the upload.
+    """
+    return _audio_capture_component(key=key, ack=ack, default=None)
+
+def _mulaw_decode_table() -> np.ndarray:
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    magnitude = (((codes & 0x0F) << 3) + 0x84) << ((codes >> 4) & 0x07)
+    return np.where(codes & 0x80, 0x84 - magnitude, magnitude - 0x84).astype(np.int16)
+
+_MULAW_DECODE = _mulaw_decode_table()
+
+def mulaw_decode(data: bytes) -> np.ndarray:
+    """G.711 mu-law bytes to int16 samples"""
+    return _MULAW_DECODE[np.frombuffer(data, dtype=np.uint8)]
+
+def mulaw_encode(samples: np.ndarray) -> bytes:
+    """int16 samples to G.711 mu-law bytes; mirrors the browser encoder"""
+    samples = samples.astype(np.int32)
+    sign = np.where(samples < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(samples), 32635) + 0x84
+    exponent = np.clip(np.floor(np.log2(magnitude)).astype(np.int32) - 7, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8).tobytes()
+
+def decode_packet(packet: bytes) -> Tuple[Dict[str, Any], np.ndarray]:
+    """Split a browser packet into its JSON header and int16 samples"""
+    (header_length,) = _HEADER_LENGTH.unpack_from(packet)
+    header_end = _HEADER_LENGTH.size + header_length
+    header = json.loads(bytes(packet[_HEADER_LENGTH.size:header_end]).decode("utf-8"))
+    payload = bytes(packet[header_end:])
+    if header.get("encoding") == "mulaw":
+        samples = mulaw_decode(payload)
+    elif header.get("encoding") == "pcm_s16le":
+        samples = np.frombuffer(payload, dtype="<i2")
+    else:
+        raise ValueError(f"Unsupported audio encoding from browser: {header.get('encoding')}")
+    return header, samples
+
+def encode_packet(header: Dict[str, Any], payload: bytes) -> bytes:
+    """Build a packet the way the browser does"""
+    encoded = json.dumps(header).encode("utf-8")
+    return _HEADER_LENGTH.pack(len(encoded)) + encoded + payload
+
+class EnergyVAD:
+    """Frame-energy voice activity detector with hangover"""
+    def __init__(self, sample_rate: int, frame_ms: int = 30, threshold_db: float = 12.0, hangover_frames: int = 10):
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.threshold_db = threshold_db
+        self.hangover_frames = hangover_frames
+        self.noise_floor_db = None
+        self._hangover = 0
+        self._in_speech = False
+        # Samples short of a whole frame, carried into the next block
+        self._remainder = np.zeros(0, dtype=np.int16)
+        # Set when the last block contained the end of a phrase
+        self.phrase_ended = False
+
+    def voiced_frames(self, samples: np.ndarray) -> np.ndarray:
+        """Return the voiced frames of a block of int16 samples as one array"""
+        self.phrase_ended = False
+        samples = np.concatenate([self._remainder, samples.astype(np.int16, copy=False)])
+        usable = len(samples) - len(samples) % self.frame_size
+        self._remainder = samples[usable:]
+        if usable == 0:
+            return samples[:0]
+        frames = samples[:usable].reshape(-1, self.frame_size).astype(np.float32)
+        energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-9)
+
+        # Track the noise floor from the quietest frames seen so far
+        block_floor = float(np.percentile(energy_db, 10))
+        if self.noise_floor_db is None:
+            self.noise_floor_db = block_floor
+        else:
+            self.noise_floor_db = min(self.noise_floor_db, block_floor) * 0.9 + block_floor * 0.1
+
+        active = energy_db > self.noise_floor_db + self.threshold_db
+        keep = np.zeros(len(active), dtype=bool)
+        for i, is_active in enumerate(active):
+            if is_active:
+                self._hangover = self.hangover_frames
+            keep[i] = is_active or self._hangover > 0
+            if not is_active and self._hangover > 0:
+                self._hangover -= 1
+            if self._in_speech and not keep[i]:
+                self.phrase_ended = True
+            self._in_speech = keep[i]
+        return frames[keep].astype(np.int16).reshape(-1)
+
+    def flush(self) -> np.ndarray:
+        """The trailing partial frame, kept if it continues speech"""
+        remainder, self._remainder = self._remainder, self._remainder[:0]
+        return remainder if self._in_speech else remainder[:0]
+
+class BrowserAudioPipeline:
+    """VAD and per-phrase STT for audio streamed from the browser.
+
+    Chunks go through a bounded queue to a worker thread. Each phrase is
+    transcribed as soon as the VAD sees it end, while the candidate keeps
+    speaking, and the running transcript is passed to on_partial.
+    """
+    def __init__(self, recognizer: "speech_recognition.Recognizer", sample_rate: int = 16000, max_pending_chunks: int = 32,
+                 on_partial: Optional[Callable[[str], None]] = None):
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self.on_partial = on_partial
+        # Bounded queue: the producer blocks while VAD/STT falls behind
+        self._chunks = queue.Queue(maxsize=max_pending_chunks)
+        self._vad = EnergyVAD(sample_rate)
+        self._phrase = []
+        self._texts = []
+        self._error = None
+        self._worker = threading.Thread(target=self._consume, daemon=True)
+        self.stats = {
+            "chunks": 0,
+            "bytes_received": 0,
+            "audio_seconds": 0.0,
+            "voiced_seconds": 0.0,
+            "phrases": 0,
+            "upload_latency_ms": None,
+            "decode_vad_ms": 0.0,
+            "transcode_ms": 0.0,
+            "stt_ms": 0.0,
+            "final_stt_ms": 0.0,
+            "bandwidth_kbps": 0.0,
+            "producer_blocked_ms": 0.0
+        }
+
+    def start(self):
+        self._worker.start()
+
+    def _transcribe(self, pcm: bytes) -> Optional[str]:
+        import speech_recognition as sr
+        from audio_processing import get_audio_pool, STT_SAMPLE_RATE
+        started = time.perf_counter()
+        # Resample and normalize to what the recognizer expects in the audio worker pool
+        pcm = get_audio_pool().prepare_for_stt(pcm=pcm, rate=self.sample_rate)
+        self.stats["transcode_ms"] += (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        try:
+            return self.recognizer.recognize_google(sr.AudioData(pcm, STT_SAMPLE_RATE, SAMPLE_WIDTH))
+        except sr.UnknownValueError:
+            return None
+        finally:
+            self.stats["stt_ms"] += (time.perf_counter() - started) * 1000
+
+    def _close_phrase(self):
+        if not self._phrase:
+            return
+        pcm = np.concatenate(self._phrase).astype("<i2").tobytes()
+        self._phrase = []
+        self.stats["voiced_seconds"] += len(pcm) / (self.sample_rate * SAMPLE_WIDTH)
+        self.stats["phrases"] += 1
+        text = self._transcribe(pcm)
+        if text:
+            self._texts.append(text)
+            if self.on_partial is not None:
+                self.on_partial(" ".join(self._texts))
+
+    def _consume(self):
+        while True:
+            chunk = self._chunks.get()
+            if chunk is None:
+                break
+            if self._error is not None:
+                continue
+            try:
+                started = time.perf_counter()
+                voiced = self._vad.voiced_frames(chunk)
+                if len(voiced):
+                    self._phrase.append(voiced)
+                self.stats["decode_vad_ms"] += (time.perf_counter() - started) * 1000
+                phrase_samples = sum(len(part) for part in self._phrase)
+                if self._vad.phrase_ended and phrase_samples >= MIN_PHRASE_SECONDS * self.sample_rate:
+                    self._close_phrase()
+            except Exception as e:
+                # Raised from finish() on the caller's thread
+                self._error = e
+
+    def feed(self, samples: np.ndarray, encoded_bytes: int = 0):
+        """Queue int16 samples in CHUNK_SAMPLES pieces, blocking while the queue is full"""
+        self.stats["bytes_received"] += encoded_bytes
+        self.stats["audio_seconds"] += len(samples) / self.sample_rate
+        started = time.perf_counter()
+        for start in range(0, len(samples), CHUNK_SAMPLES):
+            self._chunks.put(samples[start:start + CHUNK_SAMPLES])
+            self.stats["chunks"] += 1
+        self.stats["producer_blocked_ms"] += (time.perf_counter() - started) * 1000
+        if self.stats["audio_seconds"]:
+            self.stats["bandwidth_kbps"] = self.stats["bytes_received"] * 8 / 1000 / self.stats["audio_seconds"]
+
+    def finish(self) -> Optional[str]:
+        """Drain the queue, transcribe the last phrase and return the full transcript"""
+        self._chunks.put(None)
+        self._worker.join()
+        if self._error is not None:
+            raise self._error
+        started = time.perf_counter()
+        tail = self._vad.flush()
+        if len(tail):
+            self._phrase.append(tail)
+        # Earlier phrases were transcribed while the candidate spoke; only the tail is left
+        self._close_phrase()
+        self.stats["final_stt_ms"] = (time.perf_counter() - started) * 1000
+        return " ".join(self._texts) or None
+
+class BrowserAudioStream:
+    """One capture, received packet by packet across Streamlit reruns"""
+    def __init__(self, capture_id: str, pipeline: BrowserAudioPipeline):
+        self.capture_id = capture_id
+        self.pipeline = pipeline
+        self.last_seq = -1
+        self.finished = False
+        pipeline.start()
+
+    def receive(self, header: Dict[str, Any], samples: np.ndarray, packet_bytes: int) -> bool:
+        """Feed a packet once; reruns that replay an old packet are ignored"""
+        if self.finished or header["seq"] <= self.last_seq:
+            return False
+        if header.get("sent_at"):
+            # Includes client/server clock skew; good enough for trend tracking
+            self.pipeline.stats["upload_latency_ms"] = max(0.0, time.time() * 1000 - header["sent_at"])
+        self.pipeline.feed(samples, packet_bytes)
+        self.last_seq = header["seq"]
+        return True
+
+    def ack(self) -> Dict[str, Any]:
+        return {"capture_id": self.capture_id, "seq": self.last_seq}
+
+def receive_browser_audio(packet: Optional[bytes],
+                          on_capture_start: Optional[Callable[[], Optional[Callable[[str], None]]]] = None) -> Optional[str]:
+    """Feed the latest browser packet to the session's capture stream.
+
+    on_capture_start is called when a new capture begins and may return an
+    on_partial callback for its running transcript. Returns None while the
+    capture is still streaming, then its transcript, or "" if it ended
+    without usable speech.
+    """
+    import speech_recognition as sr
+    if not packet:
+        return None
+    stream = None
+    try:
+        header, samples = decode_packet(packet)
+        stream = st.session_state.get("browser_audio_stream")
+        if stream is None or stream.capture_id != header["capture_id"]:
+            if stream is not None and not stream.finished:
+                # An abandoned capture; stop its worker
+                stream.pipeline._chunks.put(None)
+            from speech_utils import get_session_recognizer
+            on_partial = on_capture_start() if on_capture_start else None
+            pipeline = BrowserAudioPipeline(get_session_recognizer(), int(header.get("sample_rate", 16000)), on_partial=on_partial)
+            stream = BrowserAudioStream(header["capture_id"], pipeline)
+            st.session_state.browser_audio_stream = stream
+        if not stream.receive(header, samples, len(packet)) or not header.get("final"):
+            return None
+        stream.finished = True
+        try:
+            text = stream.pipeline.finish()
+        finally:
+            st.session_state.audio_capture_stats = stream.pipeline.stats
+        if not text:
+            st.error("Could not hear any speech. Please speak clearly and try again.")
+        return text or ""
+    except sr.RequestError as e:
+        st.error(f"Could not request results from speech recognition service: {str(e)}")
+    except Exception as e:
+        st.error(f"Error processing browser audio: {str(e)}")
+    # The capture cannot be recovered; later packets of it are ignored
+    if stream is not None:
+        stream.finished = True
+    return ""
+
+def browser_audio_ack() -> Optional[Dict[str, Any]]:
+    """Acknowledgement for the packet the session's stream processed last"""
+    stream = st.session_state.get("browser_audio_stream")
+    return stream.ack() if stream is not None else None
@@ -1,14 +1,13 @@
 import os
-from dotenv import load_dotenv
+import threading
 import streamlit as st
 
-# Load environment variables
-load_dotenv()
-
 # Configuration class to manage environment variables and settings
 class Config:
     def __init__(self):
         self.groq_api_key = os.getenv("GROQ_API_KEY")
+        # "browser" records in the candidate's browser; "server" opens a local microphone
+        self.audio_capture = os.getenv("AUDIO_CAPTURE", "browser").strip().lower()
         self.validate_config()
     
     def validate_config(self):
@@ -18,15 +17,28 @@ class Config:
         if not isinstance(self.groq_api_key, str) or len(self.groq_api_key.strip()) == 0:
             raise ValueError("Invalid GROQ_API_KEY format. Please check your API key.")
         self.groq_api_key = self.groq_api_key.strip()
+        if self.audio_capture not in ("browser", "server"):
+            raise ValueError("AUDIO_CAPTURE must be either 'browser' or 'server'.")
 
 # Initialize configuration
 def init_config():
     """Initialize and validate configuration"""
     try:
+        # Load environment variables; deferred so importing this module stays cheap
+        from dotenv import load_dotenv
+        load_dotenv()
         return Config()
     except Exception as e:
         st.error(f"Configuration Error: {str(e)}")
         st.stop()
 
-# Global configuration instance
-config = init_config()
\ No newline at end of file
+_config = None
+_config_lock = threading.Lock()
+
+def get_config():
+    """Get the configuration, loading and validating it on first use"""
+    global _config
+    with _config_lock:
+        if _config is None:
+            _config = init_config()
+        return _config
\ No newline at end of file
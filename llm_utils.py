@@ -1,204 +1,299 @@
 import streamlit as st
-from groq import Groq
-import os
-from dotenv import load_dotenv
+import threading
+import time
 from functools import lru_cache
 import hashlib
 import json
 
-# Load environment variables
-load_dotenv()
-
 # Import configuration
-from config import config
+from config import get_config
+from prompts import INTERVIEWER, QUESTION_BATCH, QUESTION_SUMMARY, registry
 
 # Initialize Groq client with proper error handling
 def initialize_groq_client():
     try:
         # Use the config instance to get the validated API key
-        api_key = config.groq_api_key
+        api_key = get_config().groq_api_key
             
-        # Initialize Groq client with validated API key
-        client = Groq(api_key=api_key)
-        
-        # Test the client with a simple completion
-        try:
-            test_completion = client.chat.completions.create(
-                messages=[{
-                    "role": "user",
-                    "content": "Test connection"
-                }],
-                model="llama-3.3-70b-versatile"
-            )
-            if test_completion and test_completion.choices:
-                return client
-            else:
-                st.error("Failed to validate Groq client connection. Please check your API key.")
-                return None
-        except Exception as e:
-            st.error(f"Failed to validate Groq client connection: {str(e)}")
-            return None
+        # Initialize Groq client with validated API key. There is no test
+        # request: a bad key fails the first real request, which reports it
+        from groq import Groq
+        return Groq(api_key=api_key)
     except Exception as e:
         st.error(f"Failed to initialize Groq client: {str(e)}")
         return None
 
-client = initialize_groq_client()
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Get the Groq client, creating it on first use"""
+    global _client
+    with _client_lock:
+        # Failed initializations are not cached so the next call retries
+        if _client is None:
+            _client = initialize_groq_client()
+        return _client
 
 # Cache configuration
 CACHE_TTL = 3600  # Cache time-to-live in seconds
 
+INTERVIEW_MODEL = "llama-3.3-70b-versatile"
+
 def generate_cache_key(data):
     """Generate a unique cache key from input data"""
     return hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
 
-@lru_cache(maxsize=100)
-def generate_interview_questions(candidate_info_str):
-    """Generate structured interview questions based on candidate info"""
+# Question categories in interview order, with the number of main questions in each
+QUESTION_PLAN = [
+    ("Introduction", 2),
+    ("Technical Skills", 3),
+    ("Behavioral", 3),
+    ("Role-specific", 2)
+]
+
+# Completion budget per main question with its sub-questions
+TOKENS_PER_QUESTION = 160
+
+def parse_questions_response(questions):
+    """Parse and validate a questions JSON response from the LLM"""
     try:
-        # Convert string back to dict
-        candidate_info = json.loads(candidate_info_str)
-        prompt = f"""Generate a structured set of 10 interview questions for a {candidate_info['position']} position.
-        The candidate's name is {candidate_info['name']}.
-        Job Requirements: {candidate_info['requirements']}
-        
-        For each main question, generate 2-3 relevant sub-questions that dive deeper into the topic.
-        Format the questions into these categories:
-        1. Introduction (2 main questions)
-        2. Technical Skills (3 main questions)
-        3. Behavioral (3 main questions)
-        4. Role-specific (2 main questions)
-        
-        IMPORTANT: Your response must be a valid JSON string with exactly this structure:
-        {
-            "questions": [
-                {
-                    "category": "Introduction",
-                    "main_question": "Tell me about your background and experience.",
-                    "sub_questions": [
-                        "What aspects of your previous roles are most relevant to this position?",
-                        "How has your education prepared you for this role?"
-                    ]
-                }
-            ]
-        }
+        # First, ensure we're working with valid JSON string
+        questions = questions.replace("'", "\"")  # Replace single quotes with double quotes
+        questions = questions.strip()
+        if not questions.startswith('{'):
+            # Try to find the JSON object start
+            start_idx = questions.find('{')
+            if start_idx != -1:
+                questions = questions[start_idx:]
+            else:
+                raise Exception("Invalid JSON format: No object start found")
         
-        Ensure to:
-        1. Use proper JSON formatting with double quotes for all strings
-        2. Include exactly 10 questions total across all categories
-        3. Each main question must have 2-3 sub-questions
-        4. Follow the category distribution specified above"""
+        questions_data = json.loads(questions)
         
-        if not client:
-            raise Exception("LLM client not initialized properly")
+        # Validate the response structure
+        if not isinstance(questions_data, dict) or 'questions' not in questions_data:
+            raise Exception("Invalid response format: Missing 'questions' key")
             
-        completion = client.chat.completions.create(
-            messages=[{"role": "system", "content": prompt}],
-            model="llama-3.3-70b-versatile",
-            temperature=0.7,
-            max_tokens=1024
-        )
-        
-        if not completion or not completion.choices:
-            raise Exception("No response received from LLM")
-            
-        questions = completion.choices[0].message.content.strip()
-        if not questions:
-            raise Exception("Empty response received from LLM")
-            
-        # Parse the JSON response with better error handling
-        try:
-            # First, ensure we're working with valid JSON string
-            questions = questions.replace("'", "\"")  # Replace single quotes with double quotes
-            questions = questions.strip()
-            if not questions.startswith('{'):
-                # Try to find the JSON object start
-                start_idx = questions.find('{')
-                if start_idx != -1:
-                    questions = questions[start_idx:]
-                else:
-                    raise Exception("Invalid JSON format: No object start found")
+        if not isinstance(questions_data['questions'], list):
+            raise Exception("Invalid response format: 'questions' must be an array")
             
-            questions_data = json.loads(questions)
-            
-            # Validate the response structure
-            if not isinstance(questions_data, dict) or 'questions' not in questions_data:
-                raise Exception("Invalid response format: Missing 'questions' key")
-                
-            if not isinstance(questions_data['questions'], list):
-                raise Exception("Invalid response format: 'questions' must be an array")
+        for q in questions_data['questions']:
+            if not all(key in q for key in ['category', 'main_question', 'sub_questions']):
+                raise Exception("Invalid question format: Missing required fields")
                 
-            for q in questions_data['questions']:
-                if not all(key in q for key in ['category', 'main_question', 'sub_questions']):
-                    raise Exception("Invalid question format: Missing required fields")
-                    
-            return questions_data
-            
-        except json.JSONDecodeError as e:
-            raise Exception(f"Failed to parse questions response as JSON: {str(e)}")
-            
+        return questions_data
+        
+    except json.JSONDecodeError as e:
+        raise Exception(f"Failed to parse questions response as JSON: {str(e)}")
+
+@lru_cache(maxsize=100)
+def _generate_question_batch_cached(candidate_info_str, category, count, previous_answers):
+    """Raises on failure so that lru_cache only keeps successful batches"""
+    # Convert string back to dict
+    candidate_info = json.loads(candidate_info_str)
+    if previous_answers:
+        previous_answers = f"\nThe candidate's answers so far:\n{previous_answers}"
+    messages = QUESTION_BATCH.messages(
+        count=count,
+        category=category,
+        position=candidate_info['position'],
+        name=candidate_info['name'],
+        requirements=candidate_info['requirements'],
+        previous_answers=previous_answers
+    )
+    
+    client = get_client()
+    if not client:
+        raise Exception("LLM client not initialized properly")
+        
+    completion = client.chat.completions.create(
+        messages=messages,
+        model=INTERVIEW_MODEL,
+        temperature=0.7,
+        max_tokens=TOKENS_PER_QUESTION * count
+    )
+    registry.record_usage(QUESTION_BATCH.version, getattr(completion, "usage", None))
+    
+    if not completion or not completion.choices:
+        raise Exception("No response received from LLM")
+        
+    questions = completion.choices[0].message.content.strip()
+    if not questions:
+        raise Exception("Empty response received from LLM")
+        
+    questions_data = parse_questions_response(questions)
+    # Keep the plan's category names even if the model paraphrases them
+    for q in questions_data['questions']:
+        q['category'] = category
+    return questions_data['questions'][:count]
+
+def generate_question_batch(candidate_info_str, category, count, previous_answers=""):
+    """Generate the main questions of one category, conditioned on earlier answers"""
+    try:
+        return _generate_question_batch_cached(candidate_info_str, category, count, previous_answers)
     except json.JSONDecodeError as e:
         st.error(f"Invalid candidate info format: {str(e)}")
         return None
     except Exception as e:
-        st.error(f"Error generating questions: {str(e)}")
+        st.error(f"Error generating {category} questions: {str(e)}")
         return None
 
-@lru_cache(maxsize=1000)
-def get_llm_response_cached(prompt_key):
-    """Cached version of LLM response generation"""
+def generate_interview_questions(candidate_info_str):
+    """Generate the full structured set of interview questions, one category at a time"""
+    questions = []
+    for category, count in QUESTION_PLAN:
+        batch = generate_question_batch(candidate_info_str, category, count)
+        if not batch:
+            return None
+        questions.extend(batch)
+    return {"questions": questions}
+
+# Completion budget for one per-question summary record
+SUMMARY_MAX_TOKENS = 300
+# Summaries run once per answered question and only extract claims, so a small model is enough
+SUMMARY_MODEL = "llama-3.1-8b-instant"
+
+def build_summary_messages(question, exchange, skills, template=QUESTION_SUMMARY):
+    """Messages asking the LLM to condense one question's exchange"""
+    transcript = "\n".join(f"{m['role'].title()}: {m['content']}" for m in exchange)
+    return template.messages(question=question, skills=", ".join(skills), transcript=transcript)
+
+def parse_summary_response(content, skills):
+    """Validate a summary completion into key claims, skills evidenced and a score"""
+    content = content.strip()
+    start_idx, end_idx = content.find('{'), content.rfind('}')
+    if start_idx == -1 or end_idx == -1:
+        raise Exception("Invalid JSON format: No object found in summary")
+    summary = json.loads(content[start_idx:end_idx + 1])
+    return {
+        "key_claims": [str(claim) for claim in summary.get("key_claims", [])],
+        "skills_evidenced": [skill for skill in summary.get("skills_evidenced", []) if skill in skills],
+        "score": max(0, min(10, int(summary.get("score", 0))))
+    }
+
+def summarize_question_exchange(question, exchange, skills, template=QUESTION_SUMMARY, model=SUMMARY_MODEL):
+    """Condense one question's exchange into key claims, skills evidenced and a score.
+    
+    Runs on background threads, so failures raise instead of using st.error.
+    """
+    client = get_client()
+    if not client:
+        raise Exception("LLM client not initialized properly")
+    completion = client.chat.completions.create(
+        messages=build_summary_messages(question, exchange, skills, template),
+        model=model,
+        temperature=0.2,
+        max_tokens=SUMMARY_MAX_TOKENS
+    )
+    registry.record_usage(template.version, getattr(completion, "usage", None))
+    return parse_summary_response(completion.choices[0].message.content, skills)
+
+def get_async_client():
+    """Async Groq client for batch jobs that run many requests concurrently"""
+    from groq import AsyncGroq
+    return AsyncGroq(api_key=get_config().groq_api_key)
+
+async def summarize_question_exchange_async(client, question, exchange, skills, template=QUESTION_SUMMARY,
+                                            model=SUMMARY_MODEL):
+    """Async variant of summarize_question_exchange using an AsyncGroq client"""
+    completion = await client.chat.completions.create(
+        messages=build_summary_messages(question, exchange, skills, template),
+        model=model,
+        temperature=0.2,
+        max_tokens=SUMMARY_MAX_TOKENS
+    )
+    registry.record_usage(template.version, getattr(completion, "usage", None))
+    return parse_summary_response(completion.choices[0].message.content, skills)
+
+def get_llm_response_cached(prompt, conversation_history=None, utterance=None, question=None, fetch=None):
+    """Get an interviewer reply through the response cache, as (reply, stock intent).
+    
+    Stock utterances such as greetings or "can you repeat the question" are
+    answered locally when the current question is known, and their intent is
+    returned so the caller does not treat them as answers. Other requests are
+    keyed on the normalized (model, prompt version, recent context) and have
+    intent None. On a miss, fetch() produces the reply if given (e.g. a
+    speculative draft), otherwise the LLM is called.
+    """
+    from response_cache import get_response_cache, get_stock_replies, normalize_request
+    cache = get_response_cache()
+    
+    if utterance:
+        try:
+            stock_reply, intent = get_stock_replies().reply(utterance, question)
+        except Exception:
+            stock_reply, intent = None, None
+        if stock_reply:
+            cache.record_stock_hit(cache.average_latency())
+            return stock_reply, intent
+    
+    key = generate_cache_key(normalize_request(INTERVIEW_MODEL, INTERVIEWER.version, prompt, conversation_history))
+    cached = cache.get(key)
+    if cached is not None:
+        return cached, None
+    
+    started = time.perf_counter()
+    response = fetch() if fetch is not None else get_llm_response(prompt, conversation_history)
+    # get_llm_response returns None on failure; put() never stores it
+    cache.put(key, response, latency=time.perf_counter() - started)
+    return response, None
+
+def build_interview_messages(prompt, conversation_history=None):
+    """Build the message list for one interviewer turn; prompt is the turn rendered with INTERVIEWER.render"""
+    # The system message is the same object on every call, so the provider sees an identical prefix
+    return INTERVIEWER.wrap(prompt, conversation_history)
+
+def stream_interview_turn(prompt, conversation_history=None, cancel_event=None):
+    """Stream one interviewer turn, stopping early if cancel_event is set.
+    
+    Returns (text, completion_tokens, cancelled); raises on request failure.
+    """
+    client = get_client()
+    if not client:
+        raise Exception("LLM client not initialized")
+    stream = client.chat.completions.create(
+        messages=build_interview_messages(prompt, conversation_history),
+        model=INTERVIEW_MODEL,
+        temperature=0.7,
+        max_tokens=1024,
+        stream=True
+    )
+    parts = []
+    chunks = 0
     try:
-        return client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt_key}],
-            model="llama-3.3-70b-versatile",
-            temperature=0.7,
-            max_tokens=1024
-        ).choices[0].message.content
-    except Exception as e:
-        st.error(f"Error in cached LLM response: {str(e)}")
-        return None
+        for chunk in stream:
+            if cancel_event is not None and cancel_event.is_set():
+                return "".join(parts), chunks, True
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                chunks += 1
+            # Groq reports usage, including prompt processing time, on the final chunk
+            x_groq = getattr(chunk, "x_groq", None)
+            if x_groq is not None and getattr(x_groq, "usage", None) is not None:
+                registry.record_usage(INTERVIEWER.version, x_groq.usage)
+    finally:
+        # Closing the stream aborts generation on the provider side
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+    return "".join(parts), chunks, False
 
 def get_llm_response(prompt, conversation_history=None, model="mixtral-8x7b-32768", temperature=0.7, max_tokens=1024):
     """Get response from Groq LLM with conversation history and configurable parameters"""
+    client = get_client()
     if not client:
         st.error("LLM client not initialized")
         return None
         
     try:
-        # Initialize messages with system message
-        messages = [{
-            "role": "system",
-            "content": """You are an AI interviewer conducting a professional job interview. Follow this structured approach:
-            1. If this is the first interaction (no conversation history):
-               - Generate and ask the first question from the structured question list
-            2. For subsequent interactions:
-               - Analyze the candidate's response
-               - Provide brief, constructive feedback if needed
-               - Ask relevant follow-up questions based on their answer
-               - When satisfied with the response, move to the next question in the sequence
-            3. Maintain professional interview etiquette and tone
-            4. Keep responses concise but informative
-            5. Track progress through questions and adapt based on candidate's responses
-            
-            Remember to:
-            - Stay focused on the current question topic
-            - Ask for clarification when needed
-            - Provide smooth transitions between questions
-            - End each response with a clear question for the candidate"""
-        }]
-        
-        # Add conversation history if available
-        if conversation_history:
-            messages.extend(conversation_history)
-        
-        # Add current user message
-        messages.append({"role": "user", "content": prompt})
-        
         completion = client.chat.completions.create(
-            messages=messages,
-            model="llama-3.3-70b-versatile",
+            messages=build_interview_messages(prompt, conversation_history),
+            model=INTERVIEW_MODEL,
             temperature=0.7,
             max_tokens=1024
         )
+        registry.record_usage(INTERVIEWER.version, getattr(completion, "usage", None))
         return completion.choices[0].message.content
     except Exception as e:
         st.error(f"Error getting LLM response: {str(e)}")
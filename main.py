@@ -13,21 +13,101 @@ st.set_page_config(
 )
 
 # Import other dependencies after page config
-import json
-from speech_utils import record_audio
-from llm_utils import get_llm_response, generate_interview_questions
+from config import get_config
+from speech_utils import record_audio, continuous_listening
+from browser_audio import browser_audio_capture, receive_browser_audio, browser_audio_ack
+from llm_utils import get_llm_response_cached
+from question_planner import QuestionPlanner
+from speculation import SpeculativeResponder, new_speculation_stats
+from response_cache import get_response_cache
+from prompts import INTERVIEWER, registry as prompt_registry
 from tts_utils import text_to_speech
+from skill_index import experience_alignment, alignment_method, preload_skill_index
 from ui_components import (
     apply_custom_css, add_security_headers,
     display_header, display_chat_history, display_initial_form,
     display_interview_interface, display_sidebar_controls,
-    display_analytics, display_help_section, display_footer
+    display_analytics, display_analytics_export, display_speculation_stats, display_cache_stats,
+    display_prompt_stats,
+    display_help_section, display_footer
 )
 from state_management import (
     initialize_session_state, update_candidate_info,
     update_interview_progress, add_message, increment_question,
-    reset_session
+    reset_session, get_session_id, get_transcript_compactor,
+    get_conversation_history, get_candidate_answers
 )
+from analytics import get_session_analytics
+
+def turn_prompt_builder():
+    """Build the interviewer turn prompt for an answer to the current question.
+    
+    The session values are read now, so the builder can run on speculation threads.
+    """
+    values = {
+        "name": st.session_state.candidate_info['name'],
+        "position": st.session_state.candidate_info['position'],
+        "requirements": st.session_state.candidate_info['requirements'],
+        "question_number": st.session_state.current_question,
+        "questions": st.session_state.interview_questions
+    }
+    return lambda user_input: INTERVIEWER.render(user_input=user_input, **values)
+
+def start_browser_speculation():
+    """Draft the reply from the browser capture's partial transcripts"""
+    if "speculation_stats" not in st.session_state:
+        st.session_state.speculation_stats = new_speculation_stats()
+    responder = SpeculativeResponder(turn_prompt_builder(), get_conversation_history(),
+                                     stats=st.session_state.speculation_stats)
+    st.session_state.browser_responder = responder
+    return responder.on_partial
+
+def process_answer(user_input, responder=None):
+    """Record the candidate's answer and get the interviewer's reply"""
+    st.session_state.messages.append({"role": "user", "content": user_input})
+    with st.chat_message("user"):
+        st.write(user_input)
+    
+    context = turn_prompt_builder()(user_input)
+    
+    with st.spinner("Processing your response..."):
+        questions = st.session_state.interview_questions.get('questions', [])
+        current_index = st.session_state.current_question
+        question = questions[current_index]['main_question'] if 0 <= current_index < len(questions) else None
+        fetch = (lambda: responder.resolve(user_input)) if responder else None
+        ai_response, stock_intent = get_llm_response_cached(context, get_conversation_history(exclude_last=True),
+                                                            utterance=user_input, question=question, fetch=fetch)
+        if responder:
+            # Answered from the cache or a stock reply; the draft is not needed
+            responder.cancel()
+        
+        # A greeting or "please repeat" is not an answer: it is not scored and the question stays open
+        if ai_response and stock_intent is None:
+            import random
+            analytics = get_session_analytics()
+            analytics.update_scores(
+                technical=random.randint(5, 15),
+                behavioral=random.randint(5, 15),
+                communication=random.randint(5, 15),
+                confidence=random.randint(5, 15)
+            )
+            # Closed questions contribute their condensed claims, not the raw transcript
+            answers = get_candidate_answers()
+            skills = [s.strip() for s in st.session_state.candidate_info["requirements"].split(",") if s.strip()]
+            alignment = experience_alignment(answers, skills)
+            if alignment is not None:
+                analytics.set_alignment(alignment)
+            analytics.record_answer(random.choice(["Confident", "Nervous", "Enthusiastic", "Calm"]))
+    
+    if ai_response:
+        st.session_state.messages.append({"role": "assistant", "content": ai_response})
+        with st.chat_message("assistant"):
+            st.write(ai_response)
+        
+        text_to_speech(ai_response)
+        
+        if stock_intent is None and increment_question():
+            st.success("Interview Complete! Thank you for your time.")
 
 # Initialize the application
 if 'initialized' not in st.session_state:
@@ -45,6 +125,14 @@ st.title("🤖 AI Interview Assistant")
 
 # Display chat history in a container
 with st.container():
+    # Earlier questions are shown as their compact records
+    if st.session_state.get("transcript_compactor"):
+        for record in get_transcript_compactor().records():
+            with st.expander(f"Q{record['question_index']}: {record['question'] or record['category']}"):
+                for claim in record["key_claims"]:
+                    st.write(f"- {claim}")
+                if record["skills_evidenced"]:
+                    st.caption("Skills evidenced: " + ", ".join(record["skills_evidenced"]))
     for message in st.session_state.messages:
         with st.chat_message(message["role"]):
             st.write(message["content"])
@@ -76,11 +164,15 @@ if not st.session_state.interview_questions:
                 try:
                     with st.spinner("Preparing your interview questions..."):
                         update_candidate_info(name, position, requirements)
-                        candidate_info_str = json.dumps(st.session_state.candidate_info)
-                        questions = generate_interview_questions(candidate_info_str)
+                        # Only the Introduction questions are generated up front;
+                        # later categories are generated in the background
+                        planner = QuestionPlanner(st.session_state.candidate_info)
                         
-                        if questions:
-                            update_interview_progress(questions)
+                        if planner.start():
+                            # A configured embedding model loads while the candidate reads question 1
+                            preload_skill_index()
+                            st.session_state.question_planner = planner
+                            update_interview_progress(planner.as_dict())
                             st.rerun()
                         else:
                             st.error("Failed to generate interview questions. Please try again.")
@@ -89,6 +181,16 @@ if not st.session_state.interview_questions:
     except Exception as e:
         st.error(f"Error in form rendering: {str(e)}")
 
+# Merge questions generated in the background and start the next category when due
+planner = st.session_state.get("question_planner")
+if planner and st.session_state.interview_questions:
+    answers = get_candidate_answers()
+    planner.ensure_lookahead(st.session_state.current_question, answers)
+    if st.session_state.current_question < planner.total_questions:
+        with st.spinner("Preparing the next question..."):
+            planner.wait_for(st.session_state.current_question, answers)
+    st.session_state.interview_questions = planner.as_dict()
+
 # Interview progress display
 if st.session_state.interview_questions:
     progress = min((st.session_state.current_question / 10) * 100, 100)
@@ -113,69 +215,53 @@ if st.session_state.interview_questions:
             st.write(f"{i}. {sub_q}")
     
     # Voice input section
-    if st.button("🎤 Start Speaking", help="Click to start speaking your answer"):
-        user_response = continuous_listening()
+    if get_config().audio_capture == "server" and st.button("🎤 Start Speaking", help="Click to start speaking your answer"):
+        # Draft the reply from partial transcripts while the candidate is still speaking
+        if "speculation_stats" not in st.session_state:
+            st.session_state.speculation_stats = new_speculation_stats()
+        responder = SpeculativeResponder(lambda transcript: transcript, stats=st.session_state.speculation_stats)
+        user_response = continuous_listening(on_partial=responder.on_partial)
         if user_response:
             add_message("user", user_response)
             with st.spinner("Analyzing your response..."):
                 try:
-                    llm_response = get_llm_response(user_response)
+                    llm_response = responder.resolve(user_response)
                     if llm_response:
                         add_message("assistant", llm_response)
                         text_to_speech(llm_response)
                         if increment_question():
                             st.success("Interview completed! Thank you for your time.")
                             st.balloons()
-                            display_analytics()
                         else:
                             st.rerun()
                 except Exception as e:
                     st.error(f"Error processing response: {str(e)}")
+        else:
+            # Nothing was heard; count the draft's tokens as wasted
+            responder.cancel()
 
     col1, col2 = st.columns([3, 1])
     with col1:
-        if st.button("🎤 Click to Answer", key="voice_button", help="Click to start voice recording"):
+        if get_config().audio_capture == "browser":
+            # Audio streams from the candidate's browser in packets; each packet is
+            # processed before the recorder is rendered so it carries the ack
+            user_input = receive_browser_audio(st.session_state.get("voice_capture"), start_browser_speculation)
+            browser_audio_capture(key="voice_capture", ack=browser_audio_ack())
+            responder = st.session_state.pop("browser_responder", None) if user_input is not None else None
+            if user_input:
+                process_answer(user_input, responder)
+            elif responder:
+                responder.cancel()
+        elif st.button("🎤 Click to Answer", key="voice_button", help="Click to start voice recording"):
             with st.spinner("Listening..."):
                 user_input = record_audio()
             
             if user_input:
-                st.session_state.messages.append({"role": "user", "content": user_input})
-                with st.chat_message("user"):
-                    st.write(user_input)
-                
-                context = f"Candidate Name: {st.session_state.candidate_info['name']}\n"
-                context += f"Position: {st.session_state.candidate_info['position']}\n"
-                context += f"Job Requirements: {st.session_state.candidate_info['requirements']}\n"
-                context += f"Current Question Number: {st.session_state.current_question}\n"
-                context += f"Interview Questions: {st.session_state.interview_questions}\n"
-                context += f"User Input: {user_input}"
-                
-                with st.spinner("Processing your response..."):
-                    import random
-                    st.session_state.analytics["emotion"].append(random.choice(["Confident", "Nervous", "Enthusiastic", "Calm"]))
-                    st.session_state.analytics["technical_score"] = min(100, st.session_state.analytics["technical_score"] + random.randint(5, 15))
-                    st.session_state.analytics["behavioral_score"] = min(100, st.session_state.analytics["behavioral_score"] + random.randint(5, 15))
-                    st.session_state.analytics["communication_score"] = min(100, st.session_state.analytics["communication_score"] + random.randint(5, 15))
-                    st.session_state.analytics["confidence_score"] = min(100, st.session_state.analytics["confidence_score"] + random.randint(5, 15))
-                    st.session_state.analytics["experience_alignment"] = min(100, st.session_state.analytics["experience_alignment"] + random.randint(5, 15))
-                    
-                    ai_response = get_llm_response(context, st.session_state.messages[:-1])
-                
-                if ai_response:
-                    st.session_state.messages.append({"role": "assistant", "content": ai_response})
-                    with st.chat_message("assistant"):
-                        st.write(ai_response)
-                    
-                    text_to_speech(ai_response)
-                    st.session_state.current_question += 1
-                    
-                    if st.session_state.current_question > 10:
-                        st.success("Interview Complete! Thank you for your time.")
-                        st.session_state.interview_stage = "complete"
+                process_answer(user_input)
     
     with col2:
         if st.button("⏭️ Skip Question", key="skip_button", help="Click to skip current question"):
-            st.session_state.current_question += 1
+            increment_question()
             st.rerun()
 
 # Sidebar controls and analytics
@@ -184,7 +270,14 @@ if display_sidebar_controls():
     st.rerun()
 
 if st.session_state.interview_questions:
-    display_analytics(st.session_state.analytics)
+    session_analytics = get_session_analytics()
+    display_analytics(session_analytics.snapshot(), alignment_method())
+    if st.session_state.get("speculation_stats"):
+        display_speculation_stats(st.session_state.speculation_stats)
+    display_cache_stats(get_response_cache())
+    display_prompt_stats(prompt_registry.stats())
+    if st.session_state.interview_stage == "complete":
+        display_analytics_export(session_analytics.export_parquet(), f"interview_{get_session_id()}.parquet")
 
 # Help section and footer
 display_help_section()
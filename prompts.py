@@ -0,0 +1,181 @@
+import re
+import string
+import textwrap
+import threading
+from typing import Any, Dict, List, Optional
+
+# Rough tokens per word piece for Llama-family tokenizers; only used for budgeting and metrics
+TOKENS_PER_PIECE = 1.3
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count without loading a tokenizer"""
+    return int(len(_PIECES.findall(text or "")) * TOKENS_PER_PIECE) + 1
+
+class PromptTemplate:
+    """Versioned prompt with a constant system prefix and a variable user suffix.
+
+    The system message is built once so every request starts with the same
+    bytes, which lets the provider reuse the processed prefix. Everything
+    that varies per request goes in the user message at the end.
+    """
+    def __init__(self, name: str, version: int, system: str, user: str = "{prompt}"):
+        self.name = name
+        self.revision = version
+        self.version = f"{name}-v{version}"
+        self.system_message = {"role": "system", "content": textwrap.dedent(system).strip()}
+        self.user = textwrap.dedent(user).strip()
+        self.fields = {field for _, field, _, _ in string.Formatter().parse(self.user) if field}
+        self.prefix_tokens = estimate_tokens(self.system_message["content"])
+        self.suffix_tokens = estimate_tokens(string.Formatter().vformat(self.user, (), {f: "" for f in self.fields}))
+
+    def render(self, **values: Any) -> str:
+        """Fill the user suffix"""
+        missing = self.fields - values.keys()
+        if missing:
+            raise KeyError(f"Prompt {self.version} is missing values for: {', '.join(sorted(missing))}")
+        return self.user.format(**values).strip()
+
+    def messages(self, conversation_history: Optional[List[Dict[str, str]]] = None, **values: Any) -> List[Dict[str, str]]:
+        """System prefix, then history, then the rendered user suffix"""
+        return self.wrap(self.render(**values), conversation_history)
+
+    def wrap(self, user_content: str, conversation_history: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, str]]:
+        """System prefix, then history, then a user suffix rendered earlier"""
+        messages = [self.system_message]
+        if conversation_history:
+            messages.extend(conversation_history)
+        messages.append({"role": "user", "content": user_content})
+        return messages
+
+class PromptRegistry:
+    """Registered template versions plus per-version prompt-processing metrics"""
+    def __init__(self):
+        self._templates = {}  # version -> template
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, template: PromptTemplate) -> PromptTemplate:
+        self._templates[template.version] = template
+        self._metrics[template.version] = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0,
+                                           "timed_calls": 0, "prompt_seconds": 0.0}
+        return template
+
+    def get(self, name: str, revision: Optional[int] = None) -> PromptTemplate:
+        """A template by name, the newest registered version unless a revision is given"""
+        if revision is not None:
+            return self._templates[f"{name}-v{revision}"]
+        versions = [template for template in self._templates.values() if template.name == name]
+        if not versions:
+            raise KeyError(f"No prompt template named {name}")
+        return max(versions, key=lambda template: template.revision)
+
+    def record_usage(self, version: str, usage: Any):
+        """Record prompt tokens and processing time from a completion's usage block"""
+        if usage is None:
+            return
+        prompt_time = getattr(usage, "prompt_time", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        with self._lock:
+            metrics = self._metrics[version]
+            metrics["calls"] += 1
+            metrics["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+            metrics["cached_tokens"] += getattr(details, "cached_tokens", 0) or 0
+            if prompt_time is not None:
+                metrics["timed_calls"] += 1
+                metrics["prompt_seconds"] += prompt_time
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-version averages for template versions that have been used"""
+        with self._lock:
+            result = {}
+            for version, metrics in self._metrics.items():
+                if not metrics["calls"]:
+                    continue
+                template = self._templates[version]
+                result[version] = {
+                    "version": template.version,
+                    "prefix_tokens": template.prefix_tokens,
+                    "suffix_tokens": template.suffix_tokens,
+                    "calls": metrics["calls"],
+                    "avg_prompt_tokens": metrics["prompt_tokens"] / metrics["calls"],
+                    "cached_ratio": metrics["cached_tokens"] / metrics["prompt_tokens"] if metrics["prompt_tokens"] else 0.0,
+                    "avg_prompt_ms": (metrics["prompt_seconds"] / metrics["timed_calls"] * 1000
+                                      if metrics["timed_calls"] else None)
+                }
+            return result
+
+registry = PromptRegistry()
+
+INTERVIEWER = registry.register(PromptTemplate("interviewer", 2, system="""
+    You are an AI interviewer conducting a professional job interview. Follow this structured approach:
+    1. If this is the first interaction (no conversation history):
+       - Generate and ask the first question from the structured question list
+    2. For subsequent interactions:
+       - Analyze the candidate's response
+       - Provide brief, constructive feedback if needed
+       - Ask relevant follow-up questions based on their answer
+       - When satisfied with the response, move to the next question in the sequence
+    3. Maintain professional interview etiquette and tone
+    4. Keep responses concise but informative
+    5. Track progress through questions and adapt based on candidate's responses
+
+    Remember to:
+    - Stay focused on the current question topic
+    - Ask for clarification when needed
+    - Provide smooth transitions between questions
+    - End each response with a clear question for the candidate
+""", user="""
+    Candidate Name: {name}
+    Position: {position}
+    Job Requirements: {requirements}
+    Current Question Number: {question_number}
+    Interview Questions: {questions}
+    User Input: {user_input}
+"""))
+
+QUESTION_BATCH = registry.register(PromptTemplate("question_batch", 2, system="""
+    You write structured job interview questions. For each main question, generate 2-3 relevant
+    sub-questions that dive deeper into the topic. When the candidate's earlier answers are given,
+    build on what they said, probe claims that need evidence and avoid asking about things they
+    have already covered.
+
+    IMPORTANT: Your response must be a valid JSON string with exactly this structure:
+    {
+        "questions": [
+            {
+                "category": "<the requested category>",
+                "main_question": "...",
+                "sub_questions": ["...", "..."]
+            }
+        ]
+    }
+
+    Ensure to:
+    1. Use proper JSON formatting with double quotes for all strings
+    2. Include exactly the requested number of questions, all with the requested category
+    3. Each main question must have 2-3 sub-questions
+""", user="""
+    Generate {count} {category} interview questions for a {position} position.
+    The candidate's name is {name}.
+    Job Requirements: {requirements}
+    {previous_answers}
+"""))
+
+QUESTION_SUMMARY = registry.register(PromptTemplate("question_summary", 2, system="""
+    You summarize one interview exchange for the final report.
+
+    Respond with only a JSON object with exactly this structure:
+    {
+        "key_claims": ["short factual claims the candidate made"],
+        "skills_evidenced": ["skills from the assessed list that the answer demonstrates"],
+        "score": 0
+    }
+    The score is an integer from 0 to 10 for the quality of the answer.
+""", user="""
+    Question: {question}
+    Skills being assessed: {skills}
+
+    Exchange:
+    {transcript}
+"""))
@@ -0,0 +1,93 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Dict, List, Optional
+
+from llm_utils import QUESTION_PLAN, generate_question_batch
+
+# Start the next category once this few generated questions remain unasked
+LOOKAHEAD_QUESTIONS = 2
+# Only the most recent answers are sent back to condition the next category
+MAX_CONDITIONING_ANSWERS = 4
+MAX_ANSWER_CHARS = 400
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="question-planner")
+
+def format_previous_answers(answers: List[str]) -> str:
+    """Condense the latest answers into the conditioning text for a batch"""
+    recent = [answer.strip()[:MAX_ANSWER_CHARS] for answer in answers if answer and answer.strip()]
+    recent = recent[-MAX_CONDITIONING_ANSWERS:]
+    return "\n".join(f"- {answer}" for answer in recent)
+
+class QuestionPlanner:
+    """Generates interview questions one category at a time"""
+    def __init__(self, candidate_info: Dict[str, str]):
+        self.candidate_info_str = json.dumps(candidate_info)
+        self.questions = []
+        self.total_questions = sum(count for _, count in QUESTION_PLAN)
+        self._next_category = 0
+        self._pending = None
+        self._pending_answers = ""
+        self._lock = threading.Lock()
+
+    def _generate_next(self, previous_answers: str = ""):
+        category, count = QUESTION_PLAN[self._next_category]
+        return generate_question_batch(self.candidate_info_str, category, count, previous_answers)
+
+    def start(self) -> bool:
+        """Generate the Introduction questions so the interview can begin"""
+        with self._lock:
+            batch = self._generate_next()
+            if not batch:
+                return False
+            self.questions.extend(batch)
+            self._next_category += 1
+            # Nothing has been answered yet; begin the next category right away
+            self._submit_next("")
+            return True
+
+    def _submit_next(self, previous_answers: str):
+        if self._pending is None and self._next_category < len(QUESTION_PLAN):
+            self._pending = _executor.submit(self._generate_next, previous_answers)
+            self._pending_answers = previous_answers
+
+    def _collect(self, timeout: Optional[float] = 0) -> bool:
+        """Merge the pending batch if it has finished; retry it once on failure"""
+        if self._pending is None:
+            return False
+        if timeout == 0 and not self._pending.done():
+            return False
+        try:
+            batch = self._pending.result(timeout=timeout)
+        except TimeoutError:
+            return False
+        if not batch:
+            # Background failures cannot reach the UI, so retry in the caller's thread
+            batch = self._generate_next(self._pending_answers)
+        self._pending = None
+        if not batch:
+            return False
+        self.questions.extend(batch)
+        self._next_category += 1
+        return True
+
+    def ensure_lookahead(self, current_question: int, answers: List[str]):
+        """Collect finished batches and start the next one when it will be needed soon"""
+        with self._lock:
+            self._collect()
+            if len(self.questions) - current_question <= LOOKAHEAD_QUESTIONS:
+                self._submit_next(format_previous_answers(answers))
+
+    def wait_for(self, index: int, answers: List[str], timeout: float = 60) -> bool:
+        """Block until the question at index has been generated"""
+        with self._lock:
+            while index >= len(self.questions) and self._next_category < len(QUESTION_PLAN):
+                self._submit_next(format_previous_answers(answers))
+                if not self._collect(timeout=timeout):
+                    return False
+            return index < len(self.questions)
+
+    def as_dict(self) -> Dict[str, list]:
+        """Questions generated so far, in the interview_questions format"""
+        with self._lock:
+            return {"questions": list(self.questions)}
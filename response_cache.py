@@ -0,0 +1,176 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Conversation turns that take part in the cache key; older turns rarely change the reply
+CACHE_HISTORY_MESSAGES = 6
+# Rough per-entry bookkeeping cost on top of the key and value bytes
+ENTRY_OVERHEAD_BYTES = 200
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting differences share a cache entry"""
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+def normalize_request(model: str, prompt_version: str, prompt: str,
+                      conversation_history: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+    """Canonical form of a request used to derive its cache key"""
+    history = (conversation_history or [])[-CACHE_HISTORY_MESSAGES:]
+    return {
+        "model": model,
+        "prompt_version": prompt_version,
+        "history": [[m["role"], normalize_text(m["content"])] for m in history],
+        "prompt": normalize_text(prompt)
+    }
+
+class ResponseCache:
+    """LRU response cache bounded by bytes, with per-entry TTL"""
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024, ttl: float = 3600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at, size, latency)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stock_hits": 0, "evictions": 0, "seconds_saved": 0.0}
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a fresh cached response, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            value, expires_at, size, latency = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            self.stats["seconds_saved"] += latency
+            return value
+
+    def put(self, key: str, value: Optional[str], latency: float = 0.0):
+        """Cache a successful response; failures and empty replies are never stored"""
+        if not value:
+            return
+        size = len(key) + len(value.encode("utf-8")) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl, size, latency)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats["evictions"] += 1
+
+    def _remove(self, key: str):
+        _, _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def average_latency(self) -> float:
+        """Mean LLM latency of the cached entries, used to estimate time saved"""
+        with self._lock:
+            if not self._entries:
+                return 0.0
+            return sum(entry[3] for entry in self._entries.values()) / len(self._entries)
+
+    def record_stock_hit(self, seconds_saved: float):
+        with self._lock:
+            self.stats["stock_hits"] += 1
+            self.stats["seconds_saved"] += seconds_saved
+
+    def hit_ratio(self) -> float:
+        with self._lock:
+            served = self.stats["hits"] + self.stats["stock_hits"]
+            total = served + self.stats["misses"]
+            return served / total if total else 0.0
+
+# Common exchanges that do not need the LLM: intent -> (example utterances, reply template)
+STOCK_EXCHANGES = {
+    "repeat": (
+        ["can you repeat the question", "could you say that again", "sorry i didn't catch that",
+         "repeat that please", "pardon can you repeat", "what was the question again"],
+        "Of course. Here is the question again: {question}"
+    ),
+    "clarify": (
+        ["what do you mean", "can you clarify the question", "could you rephrase that",
+         "i don't understand the question", "can you explain the question"],
+        "Sure, let me put it another way. {question} A concrete example from your own experience would be a great way to answer."
+    ),
+    "greeting": (
+        ["hello", "hi", "hi there", "good morning", "good afternoon", "nice to meet you", "hello nice to meet you"],
+        "Hello, nice to meet you too! Let's begin. {question}"
+    )
+}
+# Only short utterances are matched; anything longer is a real answer
+MAX_STOCK_WORDS = 6
+STOCK_SIMILARITY_THRESHOLD = 0.75
+# Share of the utterance's words that must come from the intent's examples, so
+# "nice to meet you, I am a data scientist" is an answer and not a greeting
+STOCK_MIN_COVERAGE = 0.8
+_WORDS = re.compile(r"[a-z']+")
+
+class StockReplies:
+    """Lexical similarity matcher for stock candidate utterances"""
+    def __init__(self, exchanges: Dict[str, Tuple[List[str], str]] = STOCK_EXCHANGES,
+                 threshold: float = STOCK_SIMILARITY_THRESHOLD, min_coverage: float = STOCK_MIN_COVERAGE):
+        from skill_index import hashed_embed
+        self.threshold = threshold
+        self.min_coverage = min_coverage
+        self.intents = []
+        self.vocabulary = {}
+        examples = []
+        for intent, (utterances, _) in exchanges.items():
+            self.intents.extend([intent] * len(utterances))
+            examples.extend(utterances)
+            self.vocabulary[intent] = {word for utterance in utterances for word in _WORDS.findall(utterance)}
+        self.templates = {intent: template for intent, (_, template) in exchanges.items()}
+        self.embeddings = hashed_embed(examples)
+
+    def match(self, utterance: str) -> Optional[str]:
+        """Return the intent of a stock utterance, or None"""
+        from skill_index import hashed_embed
+        words = _WORDS.findall((utterance or "").lower())
+        if not words or len(words) > MAX_STOCK_WORDS:
+            return None
+        similarities = self.embeddings @ hashed_embed([utterance])[0]
+        best = int(similarities.argmax())
+        if similarities[best] < self.threshold:
+            return None
+        intent = self.intents[best]
+        # Similar is not enough: an answer that opens with a stock phrase still has words of its own
+        coverage = sum(word in self.vocabulary[intent] for word in words) / len(words)
+        return intent if coverage >= self.min_coverage else None
+
+    def reply(self, utterance: str, question: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """(local reply, intent) for a stock utterance, or (None, None)"""
+        intent = self.match(utterance) if question else None
+        return (self.templates[intent].format(question=question), intent) if intent else (None, None)
+
+_response_cache = None
+_stock_replies = None
+_init_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide response cache"""
+    global _response_cache
+    with _init_lock:
+        if _response_cache is None:
+            from llm_utils import CACHE_TTL
+            _response_cache = ResponseCache(ttl=CACHE_TTL)
+        return _response_cache
+
+def get_stock_replies() -> StockReplies:
+    """Process-wide stock reply matcher, embedded on first use"""
+    global _stock_replies
+    with _init_lock:
+        if _stock_replies is None:
+            _stock_replies = StockReplies()
+        return _stock_replies
@@ -0,0 +1,241 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "interview_results")
+
+SCORE_COLUMNS = ["technical_score", "behavioral_score", "communication_score", "confidence_score", "experience_alignment"]
+# Columns returned by default; transcripts and questions are only read when asked for
+# Which summary prompt version and model produced the scores, so variants can be compared
+VARIANT_COLUMNS = ["summary_prompt_version", "summary_model"]
+SUMMARY_COLUMNS = ["interview_id", "completed_at", "candidate_name", "position", "skills",
+                   "questions_answered", "duration_seconds"] + SCORE_COLUMNS + VARIANT_COLUMNS
+DETAIL_COLUMNS = ["transcript", "questions", "question_records"]
+COMPACTION_LOCK_FILE = ".compaction.lock"
+# A compaction never takes this long, so an older lock file is left over from a crash
+STALE_LOCK_SECONDS = 600
+
+class InterviewResultsStore:
+    """Append-only Parquet store of completed interviews with a background writer"""
+    def __init__(self, root: str = DEFAULT_RESULTS_DIR, batch_size: int = 50,
+                 flush_interval: float = 5.0, max_pending: int = 1000, compact_threshold: int = 20):
+        self.root = root
+        self.compact_threshold = compact_threshold
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._flushed = threading.Condition()
+        self._submitted = 0
+        self._written = 0
+        self.failed_records = 0
+        os.makedirs(self.root, exist_ok=True)
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+
+    def submit(self, record: Dict[str, Any]):
+        """Queue a completed interview for writing without blocking the caller"""
+        with self._flushed:
+            self._submitted += 1
+        self._pending.put(record)
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Wait until every submitted interview is on disk"""
+        deadline = time.monotonic() + timeout
+        with self._flushed:
+            while self._written < self._submitted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._flushed.wait(remaining)
+        return True
+
+    def _write_loop(self):
+        while True:
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            except Exception:
+                # The store is best-effort; a failed batch must not stop the writer.
+                # Callers check failed_records before treating their records as durable
+                logger.exception("Failed to write %d interview results", len(batch))
+                with self._flushed:
+                    self.failed_records += len(batch)
+            else:
+                try:
+                    if len(self._part_files()) >= self.compact_threshold:
+                        self.compact()
+                except Exception:
+                    # The batch is already on disk, so this does not count as a failed write
+                    logger.exception("Failed to compact interview results")
+            with self._flushed:
+                self._written += len(batch)
+                self._flushed.notify_all()
+
+    def _write_batch(self, records: List[Dict[str, Any]]):
+        import pandas as pd
+        self._write_frame(pd.DataFrame([_normalize_record(record) for record in records]))
+
+    def _write_frame(self, frame):
+        import pyarrow as pa
+        self._write_table(pa.Table.from_pandas(frame, preserve_index=False))
+
+    def _write_table(self, table):
+        import pyarrow.parquet as pq
+        name = f"part-{datetime.now():%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:8]}.parquet"
+        temp_path = os.path.join(self.root, f".{name}.tmp")
+        pq.write_table(table, temp_path, compression="zstd")
+        # Rename last so readers never see a partially written file
+        os.replace(temp_path, os.path.join(self.root, name))
+
+    def _part_files(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.root, "part-*.parquet")))
+
+    def _tier(self, rows: int, fanout: int) -> int:
+        """Size tier of a part: tier k holds about batch_size * fanout**k rows"""
+        tier, limit = 0, self.batch_size * fanout
+        while rows >= limit:
+            tier += 1
+            limit *= fanout
+        return tier
+
+    def _lock_compaction(self) -> bool:
+        """Take the store's compaction lock file; False if another process holds it"""
+        path = os.path.join(self.root, COMPACTION_LOCK_FILE)
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            # Left behind by a process that died mid-compaction; the next attempt can take it
+            try:
+                if time.time() - os.path.getmtime(path) > STALE_LOCK_SECONDS:
+                    os.remove(path)
+            except OSError:
+                pass
+            return False
+
+    def compact(self, min_files: Optional[int] = None) -> int:
+        """Merge parts of similar size, min_files at a time; returns the number of parts merged.
+
+        Tiered compaction: only parts in the same size tier are merged, so each
+        interview is rewritten about log(total / batch_size) times rather than on
+        every compaction. A lock file keeps two processes sharing the directory
+        from merging the same parts and duplicating rows.
+        """
+        if not self._lock_compaction():
+            return 0
+        try:
+            return self._compact_tiers(min_files or self.compact_threshold)
+        finally:
+            os.remove(os.path.join(self.root, COMPACTION_LOCK_FILE))
+
+    def _compact_tiers(self, fanout: int) -> int:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        merged = 0
+        while True:
+            tiers = {}
+            for part in self._part_files():
+                tiers.setdefault(self._tier(pq.read_metadata(part).num_rows, fanout), []).append(part)
+            full = [parts for _, parts in sorted(tiers.items()) if len(parts) >= fanout]
+            if not full:
+                return merged
+            # Oldest parts of the smallest full tier; the result may fill the next tier
+            parts = full[0][:fanout]
+            self._write_table(pa.concat_tables([pq.read_table(part) for part in parts], promote_options="default"))
+            for part in parts:
+                os.remove(part)
+            merged += len(parts)
+
+    def query(self, position: Optional[str] = None, skills: Optional[List[str]] = None,
+              score_ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+              columns: Optional[List[str]] = None, include_details: bool = False):
+        """Filter stored interviews by position, skills and score ranges"""
+        import pandas as pd
+        if columns is None:
+            columns = SUMMARY_COLUMNS + (DETAIL_COLUMNS if include_details else [])
+        parts = self._part_files()
+        if not parts:
+            return pd.DataFrame(columns=columns)
+
+        # Position and score filters are pushed down to the Parquet reader
+        filters = []
+        if position:
+            filters.append(("position", "==", position))
+        for column, (low, high) in (score_ranges or {}).items():
+            if column not in SCORE_COLUMNS:
+                raise ValueError(f"Unknown score column: {column}")
+            filters.append((column, ">=", low))
+            filters.append((column, "<=", high))
+
+        read_columns = list(dict.fromkeys(columns + (["skills"] if skills else [])))
+        try:
+            frame = pd.read_parquet(parts, columns=read_columns, filters=filters or None, schema=_schema(parts))
+        except FileNotFoundError:
+            # A compaction replaced the part files between listing and reading
+            parts = self._part_files()
+            frame = pd.read_parquet(parts, columns=read_columns, filters=filters or None, schema=_schema(parts))
+        if skills:
+            mask = pd.Series(True, index=frame.index)
+            for skill in skills:
+                mask &= frame["skills"].str.contains(f"|{skill}|", regex=False)
+            frame = frame[mask]
+        return frame[columns].reset_index(drop=True)
+
+def _schema(parts: List[str]):
+    """Schema covering every part, so parts written before a column was added read it as null"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    return pa.unify_schemas([pq.read_schema(part) for part in parts])
+
+def _normalize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten an interview record into the store's column layout"""
+    skills = record.get("skills") or []
+    row = {
+        "interview_id": record.get("interview_id") or uuid.uuid4().hex,
+        "completed_at": record.get("completed_at") or datetime.now(),
+        "candidate_name": record.get("candidate_name", ""),
+        "position": record.get("position", ""),
+        # Delimited on both ends so skill filters match whole names only
+        "skills": "|" + "|".join(skills) + "|" if skills else "",
+        "questions_answered": int(record.get("questions_answered", 0)),
+        "duration_seconds": float(record.get("duration_seconds", 0)),
+        "transcript": json.dumps(record.get("transcript", [])),
+        "questions": json.dumps(record.get("questions")),
+        "question_records": json.dumps(record.get("question_records", [])),
+        "summary_prompt_version": record.get("summary_prompt_version", ""),
+        "summary_model": record.get("summary_model", ""),
+    }
+    for column in SCORE_COLUMNS:
+        row[column] = float(record.get(column, 0))
+    return row
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_results_store(root: str = DEFAULT_RESULTS_DIR) -> InterviewResultsStore:
+    """Get the process-wide results store, starting its writer on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = InterviewResultsStore(root)
+        return _store
@@ -0,0 +1,252 @@
+import argparse
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from job_data import skills_by_position
+
+# Hashed lexical embeddings are the default. SKILL_EMBEDDING_MODEL can name a
+# sentence-transformers model instead (run on CPU, needs sentence-transformers)
+DEFAULT_EMBEDDING_MODEL = "hashed"
+SEMANTIC_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# Hashed n-gram embeddings: deterministic and dependency-free, but lexical only
+EMBEDDING_DIM = 1024
+INDEX_VERSION = 2
+DEFAULT_INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_index")
+
+# Answers are scored in windows so one relevant sentence is not diluted by the rest
+WINDOW_WORDS = 12
+# Cosine similarity below the floor is noise; at saturation it is full evidence
+ALIGNMENT_FLOOR = 0.12
+ALIGNMENT_SATURATION = 0.3
+# Placeholders for sentence-transformers models: calibrate against scored answers before relying on them
+MODEL_ALIGNMENT_FLOOR = 0.2
+MODEL_ALIGNMENT_SATURATION = 0.45
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+def _features(text: str) -> List[str]:
+    """Word unigrams, bigrams and character trigrams of a text"""
+    words = _TOKEN_PATTERN.findall(text.lower())
+    features = list(words)
+    features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f"<{word}>"
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+def hashed_embed(texts: List[str], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """Embed a batch of texts as L2-normalized signed feature hashes"""
+    rows, cols, signs = [], [], []
+    for row, text in enumerate(texts):
+        for feature in _features(text):
+            digest = zlib.crc32(feature.encode("utf-8"))
+            rows.append(row)
+            cols.append(digest % dim)
+            signs.append(1.0 if digest & 0x80000000 else -1.0)
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    if rows:
+        np.add.at(matrix, (np.asarray(rows), np.asarray(cols)), np.asarray(signs, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+class HashedEmbedder:
+    """Lexical fallback: only shared words and word pieces count as evidence"""
+    name = "hashed"
+    semantic = False
+    dim = EMBEDDING_DIM
+    floor = ALIGNMENT_FLOOR
+    saturation = ALIGNMENT_SATURATION
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return hashed_embed(texts, self.dim)
+
+class ModelEmbedder:
+    """Sentence-embedding model on CPU; related terms score without sharing words"""
+    semantic = True
+    floor = MODEL_ALIGNMENT_FLOOR
+    saturation = MODEL_ALIGNMENT_SATURATION
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return self.model.encode(texts, batch_size=64, normalize_embeddings=True,
+                                 convert_to_numpy=True).astype(np.float32)
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+def configured_embedding_model() -> str:
+    """Name of the embedder selected by SKILL_EMBEDDING_MODEL"""
+    return os.getenv("SKILL_EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL).strip() or HashedEmbedder.name
+
+def get_embedder():
+    """The configured model embedder when it loads, otherwise the hashed fallback"""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            model_name = configured_embedding_model()
+            _embedder = HashedEmbedder()
+            if model_name != HashedEmbedder.name:
+                try:
+                    _embedder = ModelEmbedder(model_name)
+                except Exception:
+                    # Not installed or the model cannot be loaded; keep the lexical fallback
+                    pass
+        return _embedder
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """Embed a batch of texts into L2-normalized float32 rows with the active embedder"""
+    return get_embedder().embed(texts)
+
+def skill_description(skill: str) -> str:
+    """Text embedded for a skill"""
+    # "AWS/Azure/GCP" and "Backup & Recovery" should match each of their parts
+    return re.sub(r"[/&]", " ", skill)
+
+def build_index(index_dir: str = DEFAULT_INDEX_DIR) -> Dict[str, int]:
+    """Embed every skill of every position and write the index to disk"""
+    embedder = get_embedder()
+    skills = sorted({skill for skills in skills_by_position.values() for skill in skills})
+    embeddings = embedder.embed([skill_description(skill) for skill in skills])
+    os.makedirs(index_dir, exist_ok=True)
+    np.save(os.path.join(index_dir, "embeddings.npy"), embeddings)
+    with open(os.path.join(index_dir, "meta.json"), "w") as f:
+        json.dump({"version": INDEX_VERSION, "embedder": embedder.name, "dim": embedder.dim, "skills": skills}, f)
+    return {"skills": len(skills), "positions": len(skills_by_position), "embedder": embedder.name,
+            "bytes": embeddings.nbytes}
+
+class SkillIndex:
+    """Memory-mapped skill embeddings with vectorized alignment scoring"""
+    def __init__(self, index_dir: str = DEFAULT_INDEX_DIR):
+        with open(os.path.join(index_dir, "meta.json")) as f:
+            meta = json.load(f)
+        self.embedder = get_embedder()
+        if (meta.get("version") != INDEX_VERSION or meta.get("embedder") != self.embedder.name
+                or meta.get("dim") != self.embedder.dim):
+            raise ValueError("Skill index is out of date. Rebuild it with 'python skill_index.py build'.")
+        self.embeddings = np.load(os.path.join(index_dir, "embeddings.npy"), mmap_mode="r")
+        self.rows = {skill: i for i, skill in enumerate(meta["skills"])}
+
+    def skill_matrix(self, skills: List[str]) -> np.ndarray:
+        """Rows of the index for the given skills, embedding unknown ones on the fly"""
+        known = [self.rows[skill] for skill in skills if skill in self.rows]
+        unknown = [skill_description(skill) for skill in skills if skill not in self.rows]
+        parts = [np.asarray(self.embeddings[known])] if known else []
+        if unknown:
+            parts.append(self.embedder.embed(unknown))
+        return np.vstack(parts) if parts else np.zeros((0, self.embedder.dim), dtype=np.float32)
+
+    def score_embeddings(self, window_embeddings: np.ndarray, skills: List[str]) -> float:
+        """Alignment (0-100) of embedded answer windows against the selected skills"""
+        skill_matrix = self.skill_matrix(skills)
+        if not len(skill_matrix) or not len(window_embeddings):
+            return 0.0
+        best = (window_embeddings @ skill_matrix.T).max(axis=0)
+        floor, saturation = self.embedder.floor, self.embedder.saturation
+        evidence = (best - floor) / (saturation - floor)
+        return float(np.clip(evidence, 0, 1).mean() * 100)
+
+    def score_answers(self, answers: List[str], skills: List[str]) -> float:
+        """Alignment (0-100) of the candidate's answers against the selected skills"""
+        return self.score_embeddings(self.embedder.embed(answer_windows(answers)), skills)
+
+def answer_windows(answers: List[str]) -> List[str]:
+    """Split answers into overlapping word windows"""
+    windows = []
+    step = WINDOW_WORDS // 2
+    for answer in answers:
+        words = answer.split()
+        for start in range(0, max(1, len(words) - step), step):
+            windows.append(" ".join(words[start:start + WINDOW_WORDS]))
+    return windows
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_skill_index(index_dir: str = DEFAULT_INDEX_DIR) -> SkillIndex:
+    """Load the skill index once per process, building it if missing"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            if not os.path.exists(os.path.join(index_dir, "meta.json")):
+                build_index(index_dir)
+            try:
+                _index = SkillIndex(index_dir)
+            except ValueError:
+                build_index(index_dir)
+                _index = SkillIndex(index_dir)
+        return _index
+
+def experience_alignment(answers: List[str], skills: List[str]) -> Optional[float]:
+    """Score how well the answers evidence the selected skills"""
+    answers = [answer for answer in answers if answer and answer.strip()]
+    if not answers or not skills:
+        return None
+    return round(get_skill_index().score_answers(answers, skills))
+
+def alignment_method() -> str:
+    """How experience alignment is measured, for labelling it in the UI"""
+    # Called on every render, so it reports the configured model until one has been loaded
+    embedder = _embedder
+    semantic = embedder.semantic if embedder is not None else configured_embedding_model() != HashedEmbedder.name
+    return "semantic similarity" if semantic else "keyword match"
+
+def preload_skill_index():
+    """Load the embedder and index on a background thread before the first answer is scored"""
+    threading.Thread(target=get_skill_index, daemon=True, name="skill-index-preload").start()
+
+def benchmark(index_dir: str = DEFAULT_INDEX_DIR, answers: int = 1000, repeats: int = 5) -> Dict[str, float]:
+    """Time batched embedding and per-answer lookup against the index"""
+    rng = np.random.default_rng(0)
+    vocabulary = sorted({word for skills in skills_by_position.values() for skill in skills for word in skill.split()})
+    vocabulary += ["I", "worked", "on", "a", "team", "project", "using", "we", "built", "the", "system", "with"]
+    texts = [" ".join(rng.choice(vocabulary, size=60)) for _ in range(answers)]
+    index = SkillIndex(index_dir)
+    positions = list(skills_by_position)
+
+    started = time.perf_counter()
+    windows = [embed_texts(answer_windows([text])) for text in texts]
+    embed_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for i, window_embeddings in enumerate(windows):
+            index.score_embeddings(window_embeddings, skills_by_position[positions[i % len(positions)]])
+    lookup_seconds = (time.perf_counter() - started) / repeats
+
+    return {
+        "answers": answers,
+        "embed_ms_per_answer": embed_seconds * 1000 / answers,
+        "lookup_ms_per_answer": lookup_seconds * 1000 / answers
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or benchmark the skill alignment index")
+    parser.add_argument("command", choices=["build", "bench"])
+    parser.add_argument("--index-dir", default=DEFAULT_INDEX_DIR)
+    parser.add_argument("--answers", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        print(json.dumps(build_index(args.index_dir), indent=2))
+    else:
+        if not os.path.exists(os.path.join(args.index_dir, "meta.json")):
+            build_index(args.index_dir)
+        print(json.dumps(benchmark(args.index_dir, args.answers), indent=2))
+
+if __name__ == "__main__":
+    main()
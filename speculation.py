@@ -0,0 +1,99 @@
+import difflib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from llm_utils import get_llm_response, stream_interview_turn
+
+# Drafts are only worth issuing once the answer has some substance
+MIN_SPECULATION_WORDS = 8
+# Word-level similarity at which the final transcript reuses the draft reply
+SIMILARITY_THRESHOLD = 0.85
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculation")
+
+def transcript_similarity(a: str, b: str) -> float:
+    """Word-level similarity between two transcripts (0-1)"""
+    return difflib.SequenceMatcher(None, a.lower().split(), b.lower().split()).ratio()
+
+def new_speculation_stats() -> Dict[str, float]:
+    """Empty per-session speculation counters"""
+    return {"drafts": 0, "hits": 0, "misses": 0, "wasted_tokens": 0, "seconds_saved": 0.0}
+
+class _Draft:
+    def __init__(self, transcript: str):
+        self.transcript = transcript
+        self.cancel_event = threading.Event()
+        self.started = time.perf_counter()
+        self.future = None
+
+class SpeculativeResponder:
+    """Drafts the interviewer's reply from partial transcripts while the candidate speaks"""
+    def __init__(self, prompt_builder: Callable[[str], str], conversation_history: Optional[List[Dict]] = None,
+                 stats: Optional[Dict[str, float]] = None):
+        self.prompt_builder = prompt_builder
+        self.conversation_history = conversation_history
+        self.stats = stats if stats is not None else new_speculation_stats()
+        self._draft = None
+        self._lock = threading.Lock()
+
+    def _run_draft(self, draft: _Draft):
+        text, tokens, cancelled = stream_interview_turn(
+            self.prompt_builder(draft.transcript), self.conversation_history, draft.cancel_event
+        )
+        return text, tokens, cancelled, time.perf_counter() - draft.started
+
+    def _discard(self, draft: _Draft):
+        """Cancel a draft and count whatever it generated as wasted"""
+        draft.cancel_event.set()
+        def count_waste(future):
+            if not future.cancelled() and future.exception() is None:
+                with self._lock:
+                    self.stats["wasted_tokens"] += future.result()[1]
+        draft.future.add_done_callback(count_waste)
+
+    def on_partial(self, transcript: str):
+        """Start a new draft for the latest partial transcript"""
+        if len(transcript.split()) < MIN_SPECULATION_WORDS:
+            return
+        with self._lock:
+            previous = self._draft
+            if previous and previous.transcript == transcript:
+                return
+            draft = _Draft(transcript)
+            draft.future = _executor.submit(self._run_draft, draft)
+            self._draft = draft
+            self.stats["drafts"] += 1
+        if previous:
+            self._discard(previous)
+
+    def cancel(self):
+        """Discard any outstanding draft, e.g. when no answer was captured"""
+        with self._lock:
+            draft, self._draft = self._draft, None
+        if draft:
+            self._discard(draft)
+
+    def resolve(self, transcript: str) -> Optional[str]:
+        """Get the reply for the final transcript, reusing the draft when it is close enough"""
+        with self._lock:
+            draft, self._draft = self._draft, None
+        if draft and transcript_similarity(draft.transcript, transcript) >= SIMILARITY_THRESHOLD:
+            try:
+                waited = time.perf_counter()
+                text, _, cancelled, draft_seconds = draft.future.result()
+                if text and not cancelled:
+                    with self._lock:
+                        self.stats["hits"] += 1
+                        # Time the draft spent generating before the final transcript was ready
+                        self.stats["seconds_saved"] += max(0.0, draft_seconds - (time.perf_counter() - waited))
+                    return text
+            except Exception:
+                pass
+        elif draft:
+            self._discard(draft)
+        if draft:
+            with self._lock:
+                self.stats["misses"] += 1
+        return get_llm_response(self.prompt_builder(transcript), self.conversation_history)
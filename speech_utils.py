@@ -1,17 +1,94 @@
 import streamlit as st
-import speech_recognition as sr
+import threading
 import time
+from collections import OrderedDict
 
-# Initialize speech recognizer
-recognizer = sr.Recognizer()
+def audio_energy(audio) -> float:
+    """RMS of an AudioData's samples, on the same scale as energy_threshold"""
+    import numpy as np
+    dtype = {1: np.int8, 2: np.int16, 4: np.int32}[audio.sample_width]
+    samples = np.frombuffer(audio.frame_data, dtype=dtype).astype(np.float64)
+    return float(np.sqrt(np.mean(samples ** 2))) if samples.size else 0.0
+
+class RecognizerPool:
+    """Per-session speech recognizers with calibration reused across turns"""
+    def __init__(self, max_sessions: int = 256, idle_timeout: float = 3600):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._recognizers = OrderedDict()
+        self._last_used = {}
+        self._calibrated = set()
+        self._lock = threading.Lock()
+    
+    def _create_recognizer(self):
+        """Create a recognizer with the interview defaults"""
+        # Imported on first use; speech_recognition is only needed once an answer is recorded
+        import speech_recognition as sr
+        recognizer = sr.Recognizer()
+        recognizer.dynamic_energy_threshold = True
+        return recognizer
+    
+    def acquire(self, session_id: str):
+        """Get the recognizer owned by a session, creating it on first use"""
+        with self._lock:
+            now = time.monotonic()
+            recognizer = self._recognizers.get(session_id)
+            if recognizer is None:
+                recognizer = self._create_recognizer()
+                self._recognizers[session_id] = recognizer
+            else:
+                self._recognizers.move_to_end(session_id)
+            self._last_used[session_id] = now
+            # Sessions that ended without a reset are dropped once idle; the size cap
+            # only applies if the pool is still full of recently active sessions
+            while len(self._recognizers) > 1:
+                oldest_id = next(iter(self._recognizers))
+                if now - self._last_used[oldest_id] < self.idle_timeout and len(self._recognizers) <= self.max_sessions:
+                    break
+                self._drop(oldest_id)
+            return recognizer
+    
+    def _drop(self, session_id: str):
+        self._recognizers.pop(session_id, None)
+        self._last_used.pop(session_id, None)
+        self._calibrated.discard(session_id)
+    
+    def calibrate(self, session_id: str, source, duration: float = 1):
+        """Adjust for ambient noise once per session"""
+        recognizer = self.acquire(session_id)
+        with self._lock:
+            if session_id in self._calibrated:
+                return recognizer
+        recognizer.adjust_for_ambient_noise(source, duration=duration)
+        with self._lock:
+            self._calibrated.add(session_id)
+        return recognizer
+    
+    def release(self, session_id: str):
+        """Drop the recognizer and calibration state of a session"""
+        with self._lock:
+            self._drop(session_id)
+
+# Shared pool handing out one recognizer per session
+recognizer_pool = RecognizerPool()
+
+def get_session_recognizer(session_id: str = None):
+    """Get the recognizer for the current Streamlit session"""
+    if session_id is None:
+        from state_management import get_session_id
+        session_id = get_session_id()
+    return recognizer_pool.acquire(session_id)
 
 def record_audio():
     """Record audio from microphone and convert to text"""
+    import speech_recognition as sr
     try:
+        from state_management import get_session_id
+        session_id = get_session_id()
         with sr.Microphone() as source:
             st.write("Listening...")
-            # Adjust for ambient noise
-            recognizer.adjust_for_ambient_noise(source, duration=1)
+            # Adjust for ambient noise on the first turn of the session only
+            recognizer = recognizer_pool.calibrate(session_id, source)
             audio = recognizer.listen(source, timeout=10, phrase_time_limit=30)
             try:
                 text = recognizer.recognize_google(audio)
@@ -26,23 +103,28 @@ def record_audio():
         st.error(f"Error accessing microphone: {str(e)}. Please check your microphone settings.")
         return None
 
-def continuous_listening():
-    """Continuously listen for user input with automatic silence detection"""
+def continuous_listening(on_partial=None):
+    """Continuously listen for user input with automatic silence detection.
+    
+    If on_partial is given, each phrase is transcribed as it arrives and the
+    running transcript is passed to it, so callers can start work early.
+    """
+    import speech_recognition as sr
     try:
+        from state_management import get_session_id
+        session_id = get_session_id()
         with sr.Microphone() as source:
             st.write("Listening... (Speak your answer)")
-            # Adjust for ambient noise
-            recognizer.adjust_for_ambient_noise(source, duration=1)
-            
-            # Set dynamic energy threshold for better silence detection
-            recognizer.dynamic_energy_threshold = True
-            recognizer.energy_threshold = 4000
+            # Adjust for ambient noise on the first turn of the session only;
+            # the dynamic threshold keeps tracking the room after that
+            recognizer = recognizer_pool.calibrate(session_id, source)
             
             # Parameters for silence detection
             min_silence_duration = 2.0  # seconds of silence to stop
             phrase_timeout = 30  # maximum time for a single phrase
             
             audio_data = []
+            partial_texts = []
             silence_start = None
             recording_start = time.time()
             
@@ -52,8 +134,15 @@ def continuous_listening():
                     audio = recognizer.listen(source, timeout=10, phrase_time_limit=phrase_timeout)
                     audio_data.append(audio)
                     
+                    if on_partial is not None:
+                        try:
+                            partial_texts.append(recognizer.recognize_google(audio))
+                            on_partial(" ".join(partial_texts))
+                        except (sr.UnknownValueError, sr.RequestError):
+                            pass
+                    
                     # Check for silence
-                    if recognizer.energy_threshold > recognizer.get_energy(audio):
+                    if recognizer.energy_threshold > audio_energy(audio):
                         if silence_start is None:
                             silence_start = time.time()
                         elif time.time() - silence_start >= min_silence_duration:
@@ -71,9 +160,12 @@ def continuous_listening():
             # Combine all audio segments and convert to text
             if audio_data:
                 try:
-                    combined_audio = audio_data[0]  # Use the first segment as base
-                    for segment in audio_data[1:]:
-                        combined_audio.extend(segment)
+                    first = audio_data[0]
+                    combined_audio = sr.AudioData(
+                        b"".join(segment.get_raw_data() for segment in audio_data),
+                        first.sample_rate,
+                        first.sample_width
+                    )
                     
                     text = recognizer.recognize_google(combined_audio)
                     return text
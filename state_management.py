@@ -1,4 +1,5 @@
 import streamlit as st
+import uuid
 
 def initialize_session_state():
     """Initialize all session state variables with proper error handling"""
@@ -13,14 +14,6 @@ def initialize_session_state():
                 "position": "",
                 "requirements": ""
             },
-            "analytics": {
-                "emotion": [],
-                "technical_score": 0,
-                "behavioral_score": 0,
-                "communication_score": 0,
-                "confidence_score": 0,
-                "experience_alignment": 0
-            },
             "error": None
         }
         
@@ -33,6 +26,12 @@ def initialize_session_state():
         st.session_state.error = str(e)
         st.stop()
 
+def get_session_id():
+    """Get a stable identifier for the current browser session"""
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
 def update_candidate_info(name, position, requirements):
     """Update candidate information in session state"""
     st.session_state.candidate_info = {
@@ -52,26 +51,113 @@ def add_message(role, content):
     """Add a new message to the chat history"""
     st.session_state.messages.append({"role": role, "content": content})
 
+def get_transcript_compactor():
+    """Get the compactor holding the closed questions of the current interview"""
+    if st.session_state.get("transcript_compactor") is None:
+        from transcript_compaction import TranscriptCompactor
+        skills = [s.strip() for s in st.session_state.candidate_info["requirements"].split(",") if s.strip()]
+        # One raw transcript file per interview, even when a session runs several
+        interview_id = f"{get_session_id()}-{uuid.uuid4().hex[:8]}"
+        st.session_state.transcript_compactor = TranscriptCompactor(interview_id, skills)
+    return st.session_state.transcript_compactor
+
+def close_current_question():
+    """Condense the current question's exchange and drop it from memory"""
+    if not st.session_state.messages:
+        return
+    questions = (st.session_state.interview_questions or {}).get("questions", [])
+    index = st.session_state.current_question
+    current_q = questions[index] if 0 <= index < len(questions) else {}
+    messages = st.session_state.messages
+    # The interviewer's last reply asks what the candidate answers next, so it opens the next exchange
+    carried = messages[-1:] if len(messages) > 1 and messages[-1]["role"] == "assistant" else []
+    get_transcript_compactor().close_question(
+        index, current_q.get("category"), current_q.get("main_question"), messages[:len(messages) - len(carried)]
+    )
+    st.session_state.messages = list(carried)
+
+def get_conversation_history(exclude_last=False):
+    """Earlier questions as a compact summary, followed by the open question's messages"""
+    messages = st.session_state.messages[:-1] if exclude_last else list(st.session_state.messages)
+    summary = get_transcript_compactor().context_message() if st.session_state.get("transcript_compactor") else None
+    return ([summary] if summary else []) + messages
+
+def get_candidate_answers():
+    """Condensed answers to closed questions plus the raw answers to the open one"""
+    compactor = st.session_state.get("transcript_compactor")
+    answers = compactor.answer_texts() if compactor else []
+    return answers + [m["content"] for m in st.session_state.messages if m["role"] == "user"]
+
 def increment_question():
     """Increment the current question counter"""
+    close_current_question()
     st.session_state.current_question += 1
     if st.session_state.current_question > 10:
         st.session_state.interview_stage = "complete"
+        # No more answers are recorded; analytics stay for the summary and export
+        from speech_utils import recognizer_pool
+        recognizer_pool.release(get_session_id())
+        archive_interview()
         return True
     return False
 
+def archive_interview():
+    """Queue the finished interview for the results store, once per interview"""
+    if st.session_state.get("interview_archived"):
+        return
+    try:
+        from analytics import get_session_analytics, SCORE_FIELDS
+        from results_store import get_results_store
+        from llm_utils import SUMMARY_MODEL
+        from prompts import QUESTION_SUMMARY
+        metrics = get_session_analytics(get_session_id()).get_metrics() or {}
+        candidate_info = st.session_state.candidate_info
+        record = {
+            "candidate_name": candidate_info["name"],
+            "position": candidate_info["position"],
+            "skills": [s.strip() for s in candidate_info["requirements"].split(",") if s.strip()],
+            "questions_answered": metrics.get("questions_answered", 0),
+            "duration_seconds": metrics.get("interview_duration", 0),
+            "questions": st.session_state.interview_questions,
+            "summary_prompt_version": QUESTION_SUMMARY.version,
+            "summary_model": SUMMARY_MODEL
+        }
+        record.update({field: metrics.get(field, 0) for field in SCORE_FIELDS})
+        open_messages = list(st.session_state.messages)
+        compactor = get_transcript_compactor()
+        
+        def submit(question_records):
+            # Runs off the script thread once the last summaries are in
+            record["question_records"] = question_records
+            record["transcript"] = compactor.raw_messages() + open_messages
+            store = get_results_store()
+            failed_before = store.failed_records
+            store.submit(record)
+            # The raw transcript is only needed until the archived record is on disk
+            if store.flush() and store.failed_records == failed_before:
+                compactor.store.delete(compactor.session_id)
+        
+        compactor.when_complete(submit)
+        st.session_state.interview_archived = True
+    except Exception as e:
+        st.warning(f"Failed to save interview results: {str(e)}")
+
 def reset_session():
     """Reset all session state variables"""
+    from analytics import analytics_pool
+    from speech_utils import recognizer_pool
+    # The next interview gets fresh analytics and a recalibrated recognizer
+    analytics_pool.release(get_session_id())
+    recognizer_pool.release(get_session_id())
+    compactor = st.session_state.get("transcript_compactor")
+    if compactor is not None and not st.session_state.get("interview_archived"):
+        # An abandoned interview is never archived, so its raw transcript is not kept
+        compactor.discard()
     st.session_state.messages = []
+    st.session_state.interview_archived = False
     st.session_state.interview_stage = "initial"
     st.session_state.current_question = 0
     st.session_state.interview_questions = None
-    st.session_state.candidate_info = {"name": "", "position": "", "requirements": ""}
-    st.session_state.analytics = {
-        "emotion": [],
-        "technical_score": 0,
-        "behavioral_score": 0,
-        "communication_score": 0,
-        "confidence_score": 0,
-        "experience_alignment": 0
-    }
\ No newline at end of file
+    st.session_state.question_planner = None
+    st.session_state.transcript_compactor = None
+    st.session_state.candidate_info = {"name": "", "position": "", "requirements": ""}
\ No newline at end of file
@@ -0,0 +1,28 @@
+import pytest
+
+from analytics import InterviewAnalytics, MOVING_AVERAGE_WINDOW
+
+def test_aggregates_use_per_answer_gains():
+    analytics = InterviewAnalytics()
+    gains = [5, 8, 11, 14, 17]
+    for gain in gains:
+        analytics.update_scores(technical=gain, behavioral=10)
+        analytics.record_answer("Calm")
+    snapshot = analytics.snapshot()
+
+    assert snapshot["technical_score"] == sum(gains)
+    recent = gains[-MOVING_AVERAGE_WINDOW:]
+    assert snapshot["moving_average"]["technical_score"] == pytest.approx(sum(recent) / len(recent))
+    assert snapshot["moving_average"]["behavioral_score"] == pytest.approx(10)
+    # Technical gains rise by 3 per answer; averaged over the five scores that is 0.6
+    assert snapshot["trend"] == pytest.approx(0.6)
+    assert list(analytics.to_frame()["technical_score_gain"]) == gains
+
+def test_clamped_scores_stop_gaining():
+    analytics = InterviewAnalytics()
+    for _ in range(12):
+        analytics.update_scores(technical=15)
+        analytics.record_answer()
+    frame = analytics.to_frame()
+    assert frame["technical_score_gain"].sum() == 100
+    assert analytics.snapshot()["moving_average"]["technical_score"] == 0
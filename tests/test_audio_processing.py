@@ -0,0 +1,57 @@
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from audio_processing import (
+    STT_SAMPLE_RATE, AudioProcessingPool, normalize, prepare_for_stt_job, resample, to_mono
+)
+
+def tone(frequency: float, rate: int, seconds: float = 1.0, amplitude: float = 0.5) -> np.ndarray:
+    return (amplitude * np.sin(2 * np.pi * frequency * np.arange(int(rate * seconds)) / rate)).astype(np.float32)
+
+def rms(samples: np.ndarray) -> float:
+    return float(np.sqrt(np.mean(samples.astype(np.float64) ** 2)))
+
+@pytest.fixture(scope="module")
+def stereo_wav() -> bytes:
+    """1.5 s of 44.1 kHz stereo speech-band audio, one tone per channel"""
+    samples = np.stack([tone(440, 44100, 1.5), tone(880, 44100, 1.5, amplitude=0.25)], axis=1)
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, 44100, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
+
+def test_resample_output_length():
+    assert len(resample(tone(440, 44100), 44100, 16000)) == 16000
+    assert len(resample(tone(440, 8000, 0.5), 8000, 16000)) == 8000
+
+def test_resample_filters_content_above_the_new_nyquist():
+    # Resampled to 16 kHz, a 12 kHz tone would alias to 4 kHz without the low-pass filter
+    aliased = resample(tone(12000, 44100), 44100, 16000)
+    kept = resample(tone(1000, 44100), 44100, 16000)
+    trim = slice(100, -100)  # the filter's edges
+    assert rms(aliased[trim]) < 0.1 * rms(kept[trim])
+    assert rms(kept[trim]) == pytest.approx(0.5 / np.sqrt(2), rel=0.05)
+
+def test_to_mono_and_normalize():
+    stereo = np.array([[0.2, 0.4], [-0.6, -0.2]], dtype=np.float32)
+    assert np.allclose(to_mono(stereo), [0.3, -0.4])
+    assert float(np.abs(normalize(to_mono(stereo))).max()) == pytest.approx(0.9)
+    silence = np.zeros(10, dtype=np.float32)
+    assert np.array_equal(normalize(silence), silence)
+
+def test_prepare_for_stt_gives_16khz_mono_pcm16(stereo_wav):
+    pcm, audio_seconds, _ = prepare_for_stt_job(data=stereo_wav)
+    samples = np.frombuffer(pcm, dtype="<i2")
+    assert audio_seconds == pytest.approx(1.5)
+    assert len(samples) == int(1.5 * STT_SAMPLE_RATE)
+    assert np.abs(samples).max() == pytest.approx(0.9 * 32767, rel=0.01)
+
+def test_pool_round_trip_matches_the_job(stereo_wav):
+    pool = AudioProcessingPool(max_workers=1)
+    try:
+        assert pool.prepare_for_stt(data=stereo_wav) == prepare_for_stt_job(data=stereo_wav)[0]
+        assert pool.stats["jobs"] == 1 and pool.stats["audio_seconds"] == pytest.approx(1.5)
+    finally:
+        pool._executor.shutdown()
@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import llm_utils
+from batch_eval import BatchEvaluator, Checkpoint, discover_interviews
+
+class RecordingStore:
+    failed_records = 0
+
+    def __init__(self, fail_writes=False):
+        self.records = []
+        self.fail_writes = fail_writes
+
+    def submit(self, record):
+        self.records.append(record)
+        if self.fail_writes:
+            # The writer thread can fail a batch before run() calls flush()
+            self.failed_records += 1
+
+    def flush(self):
+        return True
+
+def write_interview(root, name, answers):
+    directory = root / name
+    directory.mkdir()
+    (directory / "metadata.json").write_text(json.dumps({"candidate_name": name, "position": "Engineer",
+                                                         "skills": ["Python"]}))
+    for index, answer in enumerate(answers):
+        (directory / f"{index:02d}.txt").write_text(answer)
+
+def test_interview_with_a_failed_summary_is_not_written(tmp_path, monkeypatch):
+    inputs = tmp_path / "interviews"
+    inputs.mkdir()
+    write_interview(inputs, "good", ["I use Python daily.", "I led a team of four."])
+    write_interview(inputs, "flaky", ["I use Python daily.", "FAIL"])
+
+    async def summarize(client, question, exchange, skills, template, model):
+        if exchange[-1]["content"] == "FAIL":
+            raise RuntimeError("rate limited")
+        return {"key_claims": [exchange[-1]["content"]], "skills_evidenced": [], "score": 8}
+    monkeypatch.setattr(llm_utils, "summarize_question_exchange_async", summarize)
+    monkeypatch.setattr(llm_utils, "get_async_client", lambda: None)
+
+    store = RecordingStore()
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.jsonl"))
+    evaluator = BatchEvaluator(workers=1)
+    asyncio.run(evaluator.run(discover_interviews(str(inputs)), store, checkpoint))
+
+    assert [record["interview_id"] for record in store.records] == ["good"]
+    assert checkpoint.done == {"good"}
+    assert evaluator.stats["failed"] == 1 and evaluator.stats["failed_summaries"] == 1
+    assert store.records[0]["technical_score"] == 80.0
+
+def test_variant_is_recorded_and_checkpointed_separately(tmp_path, monkeypatch):
+    inputs = tmp_path / "interviews"
+    inputs.mkdir()
+    write_interview(inputs, "one", ["I use Python daily."])
+    used = []
+    async def summarize(client, question, exchange, skills, template, model):
+        used.append((template.version, model))
+        return {"key_claims": [], "skills_evidenced": [], "score": 5}
+    monkeypatch.setattr(llm_utils, "summarize_question_exchange_async", summarize)
+    monkeypatch.setattr(llm_utils, "get_async_client", lambda: None)
+
+    path = str(tmp_path / "checkpoint.jsonl")
+    for model in ("model-a", "model-b"):
+        evaluator = BatchEvaluator(workers=1, prompt_revision=2, model=model)
+        checkpoint = Checkpoint(path, evaluator.variant)
+        assert checkpoint.done == set()
+        store = RecordingStore()
+        asyncio.run(evaluator.run(discover_interviews(str(inputs)), store, checkpoint))
+        assert store.records[0]["summary_prompt_version"] == "question_summary-v2"
+        assert store.records[0]["summary_model"] == model
+
+    assert used == [("question_summary-v2", "model-a"), ("question_summary-v2", "model-b")]
+    assert Checkpoint(path, "question_summary-v2/model-a").done == {"one"}
+
+def test_write_failure_during_submit_is_not_checkpointed(tmp_path, monkeypatch):
+    inputs = tmp_path / "interviews"
+    inputs.mkdir()
+    write_interview(inputs, "one", ["I use Python daily."])
+    async def summarize(client, question, exchange, skills, template, model):
+        return {"key_claims": [], "skills_evidenced": [], "score": 5}
+    monkeypatch.setattr(llm_utils, "summarize_question_exchange_async", summarize)
+    monkeypatch.setattr(llm_utils, "get_async_client", lambda: None)
+
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.jsonl"))
+    asyncio.run(BatchEvaluator(workers=1).run(discover_interviews(str(inputs)), RecordingStore(fail_writes=True), checkpoint))
+    assert checkpoint.done == set()
@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from browser_audio import (
+    BrowserAudioPipeline, EnergyVAD, decode_packet, encode_packet, mulaw_decode, mulaw_encode
+)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "answer_three_phrases.wav")
+PACKET_SAMPLES = 16000  # what the browser sends per packet: one second at 16 kHz
+VOICED_SECONDS = 1.4 + 1.2 + 1.5  # the three phrases in the fixture
+
+class StubRecognizer:
+    """Returns one word per phrase and remembers how much audio each phrase had"""
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.phrase_seconds = []
+
+    def recognize_google(self, audio):
+        time.sleep(self.delay)
+        self.phrase_seconds.append(len(audio.frame_data) / (audio.sample_rate * audio.sample_width))
+        return f"phrase{len(self.phrase_seconds)}"
+
+@pytest.fixture(scope="module")
+def recording():
+    samples, rate = sf.read(FIXTURE, dtype="int16")
+    assert rate == 16000
+    return samples
+
+def browser_packets(samples):
+    """Encode a recording the way the browser streams it"""
+    starts = range(0, len(samples), PACKET_SAMPLES)
+    for seq, start in enumerate(starts):
+        header = {"capture_id": "fixture", "seq": seq, "final": seq == len(starts) - 1,
+                  "encoding": "mulaw", "sample_rate": 16000}
+        yield encode_packet(header, mulaw_encode(samples[start:start + PACKET_SAMPLES]))
+
+def test_mulaw_round_trip_keeps_speech_quality(recording):
+    decoded = mulaw_decode(mulaw_encode(recording))
+    signal = np.mean(recording.astype(np.float64) ** 2)
+    error = np.mean((decoded.astype(np.float64) - recording) ** 2)
+    assert 10 * np.log10(signal / error) > 30
+
+def test_vad_keeps_the_phrases_and_finds_their_ends(recording):
+    vad = EnergyVAD(16000)
+    voiced = 0
+    phrase_ends = 0
+    for start in range(0, len(recording), 4000):
+        voiced += len(vad.voiced_frames(recording[start:start + 4000]))
+        phrase_ends += vad.phrase_ended
+    # Each phrase keeps 10 hangover frames (0.3 s) after it ends
+    assert voiced / 16000 == pytest.approx(VOICED_SECONDS + 3 * 0.3, abs=0.15)
+    assert phrase_ends == 3
+
+def test_vad_keeps_every_sample_of_continuous_speech(recording):
+    # Every frame counts as voiced; 4000-sample blocks are not a multiple of the 480-sample frame
+    vad = EnergyVAD(16000, threshold_db=-200)
+    samples = recording[:48000]
+    voiced = [vad.voiced_frames(samples[start:start + 4000]) for start in range(0, len(samples), 4000)]
+    voiced.append(vad.flush())
+    assert np.array_equal(np.concatenate(voiced), samples)
+
+def test_pipeline_transcribes_phrases_while_streaming(recording):
+    recognizer = StubRecognizer()
+    partials = []
+    pipeline = BrowserAudioPipeline(recognizer, on_partial=partials.append)
+    pipeline.start()
+    for packet in browser_packets(recording):
+        header, samples = decode_packet(packet)
+        pipeline.feed(samples, len(packet))
+    text = pipeline.finish()
+
+    assert text == "phrase1 phrase2 phrase3"
+    # The first two phrases reached on_partial before the capture finished
+    assert partials[:2] == ["phrase1", "phrase1 phrase2"]
+    assert all(seconds >= 1.0 for seconds in recognizer.phrase_seconds)
+    assert pipeline.stats["phrases"] == 3
+    # One mu-law byte per sample plus a small header per packet
+    assert pipeline.stats["bandwidth_kbps"] < 140
+
+def test_slow_stt_blocks_the_producer(recording):
+    pipeline = BrowserAudioPipeline(StubRecognizer(delay=0.5), max_pending_chunks=2)
+    pipeline.start()
+    feeding = threading.Thread(target=lambda: [
+        pipeline.feed(decode_packet(packet)[1]) for packet in browser_packets(recording)
+    ])
+    feeding.start()
+    feeding.join()
+    pipeline.finish()
+    assert pipeline.stats["producer_blocked_ms"] > 200
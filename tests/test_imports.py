@@ -0,0 +1,59 @@
+import ast
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Loaded on first use only; importing any of them at startup slows every cold start
+DEFERRED_MODULES = ("groq", "gtts", "playsound", "speech_recognition", "sentence_transformers")
+# Import budget for main's dependencies, as a multiple of streamlit's own import time so it
+# holds on slower machines. Measured at about 1.7x; importing groq eagerly takes it past 3x
+IMPORT_BUDGET_VS_STREAMLIT = 2.5
+
+def main_dependencies():
+    """Repo modules that main.py imports at the top level"""
+    with open(os.path.join(ROOT, "main.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = set()
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module:
+            modules.add(node.module)
+        elif isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names)
+    return sorted(module for module in modules if os.path.exists(os.path.join(ROOT, f"{module}.py")))
+
+def test_main_dependencies_defer_heavy_imports():
+    modules = main_dependencies()
+    assert "llm_utils" in modules and "speech_utils" in modules
+    code = "\n".join(["import sys"] + [f"import {module}" for module in modules] + [
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    ])
+    # A fresh interpreter, since this test process may already have imported them
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+def import_times(modules):
+    """Cumulative microseconds per top-level import, from python -X importtime"""
+    code = "\n".join(f"import {module}" for module in modules)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if not line.startswith("import time:") or len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2][1:]
+        # Nested imports are indented; only top-level imports are counted, so nothing twice
+        if not name.startswith(" "):
+            times[name.strip()] = int(fields[1])
+    return times
+
+def test_main_dependencies_import_within_budget():
+    modules = ["streamlit"] + main_dependencies()
+    # Best of three runs, so a cold disk cache or bytecode compilation does not count
+    runs = [import_times(modules) for _ in range(3)]
+    streamlit = min(run["streamlit"] for run in runs)
+    total = min(sum(run.values()) for run in runs)
+    assert total <= IMPORT_BUDGET_VS_STREAMLIT * streamlit, (
+        f"main's dependencies import in {total / 1000:.0f} ms, streamlit alone in {streamlit / 1000:.0f} ms"
+    )
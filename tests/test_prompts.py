@@ -0,0 +1,53 @@
+import types
+
+import pytest
+
+from prompts import INTERVIEWER, PromptRegistry, PromptTemplate, estimate_tokens
+
+TURN = dict(name="Ada", position="Engineer", requirements="Python", question_number=2,
+            questions={"questions": []}, user_input="I built a compiler.")
+
+def test_render_fills_the_suffix_and_rejects_missing_values():
+    template = PromptTemplate("greeting", 1, system="Be brief.", user="""
+        Hello {name}
+    """)
+    assert template.version == "greeting-v1"
+    assert template.fields == {"name"}
+    assert template.render(name="Ada") == "Hello Ada"
+    with pytest.raises(KeyError, match="greeting-v1.*name"):
+        template.render()
+
+def test_messages_keep_a_constant_prefix_and_put_variable_text_last():
+    history = [{"role": "assistant", "content": "Tell me about yourself."}]
+    first = INTERVIEWER.messages(history, **TURN)
+    second = INTERVIEWER.messages(history, **dict(TURN, user_input="Something else."))
+    # The same system message object every time, so the provider sees identical prefix bytes
+    assert first[0] is second[0] is INTERVIEWER.system_message
+    assert first[1:-1] == history
+    assert first[-1]["content"].endswith("User Input: I built a compiler.")
+    assert INTERVIEWER.wrap(INTERVIEWER.render(**TURN), history) == first
+
+def test_interviewer_turn_is_versioned_with_token_estimates():
+    assert INTERVIEWER.fields == set(TURN)
+    assert INTERVIEWER.prefix_tokens > INTERVIEWER.suffix_tokens > estimate_tokens("")
+
+def test_registry_versions_and_usage_stats():
+    registry = PromptRegistry()
+    old = registry.register(PromptTemplate("summary", 1, system="Old"))
+    new = registry.register(PromptTemplate("summary", 2, system="New"))
+    assert registry.get("summary") is new
+    assert registry.get("summary", 1) is old
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+    usage = types.SimpleNamespace(prompt_tokens=100, prompt_time=0.02,
+                                  prompt_tokens_details=types.SimpleNamespace(cached_tokens=60))
+    registry.record_usage(new.version, usage)
+    registry.record_usage(new.version, types.SimpleNamespace(prompt_tokens=50))
+    registry.record_usage(new.version, None)
+    stats = registry.stats()
+    assert list(stats) == ["summary-v2"]
+    assert stats["summary-v2"]["calls"] == 2
+    assert stats["summary-v2"]["avg_prompt_tokens"] == 75
+    assert stats["summary-v2"]["cached_ratio"] == pytest.approx(60 / 150)
+    assert stats["summary-v2"]["avg_prompt_ms"] == pytest.approx(20)
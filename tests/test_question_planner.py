@@ -0,0 +1,36 @@
+import json
+
+import llm_utils
+import question_planner
+from question_planner import QuestionPlanner
+
+CANDIDATE = {"name": "Ada", "position": "Engineer", "requirements": "Python"}
+
+class FlakyCompletions:
+    """Fails the first request, then answers with the requested number of questions"""
+    def __init__(self):
+        self.requests = []
+
+    def create(self, messages, max_tokens, **kwargs):
+        self.requests.append(messages[-1]["content"])
+        if len(self.requests) == 1:
+            raise RuntimeError("service unavailable")
+        count = max_tokens // llm_utils.TOKENS_PER_QUESTION
+        questions = [{"category": "x", "main_question": f"Q{i}", "sub_questions": ["a", "b"]} for i in range(count)]
+        message = type("Message", (), {"content": json.dumps({"questions": questions})})
+        return type("Completion", (), {"choices": [type("Choice", (), {"message": message})], "usage": None})
+
+def test_failed_batch_is_retried_with_the_same_answers(monkeypatch):
+    completions = FlakyCompletions()
+    client = type("Client", (), {"chat": type("Chat", (), {"completions": completions})})
+    monkeypatch.setattr(llm_utils, "get_client", lambda: client)
+    llm_utils._generate_question_batch_cached.cache_clear()
+
+    planner = QuestionPlanner(CANDIDATE)
+    planner._submit_next("- I built a compiler")
+    assert planner._collect(timeout=10)
+
+    # The failure was not cached and the retry kept the conditioning answers
+    assert len(completions.requests) == 2
+    assert all("I built a compiler" in request for request in completions.requests)
+    assert planner.questions[0]["category"] == question_planner.QUESTION_PLAN[0][0]
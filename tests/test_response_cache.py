@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from llm_utils import get_llm_response_cached
+from response_cache import ENTRY_OVERHEAD_BYTES, ResponseCache, StockReplies
+
+QUESTION = "Tell me about a project you led."
+
+def test_stock_utterance_is_answered_locally_with_its_intent():
+    def fetch():
+        raise AssertionError("a stock utterance must not reach the LLM")
+    reply, intent = get_llm_response_cached("stock turn", [], utterance="can you repeat the question",
+                                            question=QUESTION, fetch=fetch)
+    assert intent == "repeat"
+    assert QUESTION in reply
+
+def test_real_answer_has_no_stock_intent():
+    answer = "I led the migration of our billing service to Kubernetes over six months."
+    reply, intent = get_llm_response_cached(f"answer turn: {answer}", [], utterance=answer,
+                                            question=QUESTION, fetch=lambda: "Thanks. What was the hardest part?")
+    assert intent is None
+    assert reply == "Thanks. What was the hardest part?"
+
+@pytest.mark.parametrize("utterance, intent", [
+    ("can you repeat the question", "repeat"),
+    ("Sorry, could you say that again?", "repeat"),
+    ("Could you clarify the question?", "clarify"),
+    ("hello, nice to meet you", "greeting"),
+])
+def test_stock_utterances_match(utterance, intent):
+    assert StockReplies().match(utterance) == intent
+
+@pytest.mark.parametrize("answer", [
+    "Nice to meet you, I am a data scientist",
+    "I can explain the design of the question service",
+    "Hello, I'm Ada, a backend engineer",
+    "good morning routines help me focus",
+    "what do you mean by scale",
+])
+def test_short_answers_are_not_stock_utterances(answer):
+    assert StockReplies().match(answer) is None
+
+def test_expired_entries_are_misses():
+    cache = ResponseCache(ttl=0.05)
+    cache.put("key", "reply")
+    assert cache.get("key") == "reply"
+    time.sleep(0.1)
+    assert cache.get("key") is None
+    assert cache.stats["misses"] == 1
+
+def test_byte_budget_evicts_least_recently_used():
+    entry_bytes = len("a") + 100 + ENTRY_OVERHEAD_BYTES
+    cache = ResponseCache(max_bytes=entry_bytes * 2)
+    cache.put("a", "x" * 100)
+    cache.put("b", "y" * 100)
+    assert cache.get("a")  # "b" is now the least recently used
+    cache.put("c", "z" * 100)
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+    assert cache.stats["evictions"] == 1
+
+def test_failed_responses_are_never_stored():
+    cache = ResponseCache()
+    cache.put("none", None)
+    cache.put("empty", "")
+    assert cache.get("none") is None and cache.get("empty") is None
+    calls = []
+    def failing_fetch():
+        calls.append(1)
+        return None
+    for _ in range(2):
+        assert get_llm_response_cached("failing turn", [], fetch=failing_fetch) == (None, None)
+    # The failure was not cached, so the second turn tried again
+    assert len(calls) == 2
@@ -0,0 +1,53 @@
+import os
+
+import pandas as pd
+
+from results_store import COMPACTION_LOCK_FILE, InterviewResultsStore
+
+def test_tiered_compaction_rewrites_each_row_a_few_times(tmp_path):
+    store = InterviewResultsStore(str(tmp_path), batch_size=10, flush_interval=0.05, compact_threshold=4)
+    written = []
+    write_table = store._write_table
+    store._write_table = lambda table: (written.append(table.num_rows), write_table(table))
+    for i in range(640):
+        store.submit({"candidate_name": f"candidate{i}", "position": "Engineer", "technical_score": i % 100})
+        if i % 10 == 9:
+            assert store.flush()
+
+    assert len(store.query()) == 640
+    # 64 batches with fanout 4 is three tiers, so each row is written at most four times
+    assert sum(written) <= 640 * 4
+    assert len(store._part_files()) < 4 * 3
+
+def test_parts_without_variant_columns_stay_readable(tmp_path):
+    # A part written before the variant columns existed
+    pd.DataFrame({"interview_id": ["old"], "candidate_name": ["Ada"], "position": ["Engineer"],
+                  "technical_score": [50.0]}).to_parquet(tmp_path / "part-00000000000000000000-old.parquet")
+    store = InterviewResultsStore(str(tmp_path), flush_interval=0.05)
+    store.submit({"interview_id": "new", "candidate_name": "Bo", "position": "Engineer",
+                  "summary_prompt_version": "question_summary-v2", "summary_model": "model-a"})
+    assert store.flush()
+    frame = store.query(columns=["interview_id", "summary_model"])
+    assert sorted(frame["interview_id"]) == ["new", "old"]
+    assert frame.set_index("interview_id").loc["new", "summary_model"] == "model-a"
+
+def test_compaction_skips_while_another_process_holds_the_lock(tmp_path):
+    store = InterviewResultsStore(str(tmp_path), batch_size=1, flush_interval=0.05, compact_threshold=100)
+    for i in range(4):
+        store.submit({"candidate_name": f"candidate{i}"})
+        assert store.flush()
+    open(os.path.join(tmp_path, COMPACTION_LOCK_FILE), "w").close()
+    assert store.compact(4) == 0
+    os.remove(os.path.join(tmp_path, COMPACTION_LOCK_FILE))
+    assert store.compact(4) == 4
+    assert not os.path.exists(os.path.join(tmp_path, COMPACTION_LOCK_FILE))
+
+def test_failed_write_is_logged_and_counted(tmp_path, caplog):
+    store = InterviewResultsStore(str(tmp_path), flush_interval=0.05)
+    def write_batch(records):
+        raise OSError("disk full")
+    store._write_batch = write_batch
+    store.submit({"candidate_name": "Ada"})
+    assert store.flush()
+    assert store.failed_records == 1
+    assert "Failed to write 1 interview results" in caplog.text
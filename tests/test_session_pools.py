@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from analytics import AnalyticsPool
+from speech_utils import RecognizerPool
+
+SESSIONS = 64
+TURNS = 50
+
+class StubRecognizer:
+    def __init__(self):
+        self.calibrations = 0
+        self.energy_threshold = 300
+
+    def adjust_for_ambient_noise(self, source, duration=1):
+        self.calibrations += 1
+
+class StubRecognizerPool(RecognizerPool):
+    def _create_recognizer(self):
+        return StubRecognizer()
+
+def _hammer(function, sessions=SESSIONS):
+    start = threading.Barrier(sessions)
+    def run(index):
+        start.wait()
+        return function(f"session-{index}")
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        return list(executor.map(run, range(sessions)))
+
+def test_recognizer_pool_isolates_sessions_and_calibrates_once():
+    pool = StubRecognizerPool()
+
+    def session(session_id):
+        recognizers = {id(pool.calibrate(session_id, source=None)) for _ in range(TURNS)}
+        recognizers.add(id(pool.acquire(session_id)))
+        return session_id, recognizers
+
+    results = _hammer(session)
+    owners = {}
+    for session_id, recognizers in results:
+        assert len(recognizers) == 1
+        owners[recognizers.pop()] = session_id
+    assert len(owners) == SESSIONS
+    for session_id, _ in results:
+        assert pool.acquire(session_id).calibrations == 1
+
+def test_recognizer_pool_release_recalibrates():
+    pool = StubRecognizerPool()
+    first = pool.calibrate("a", source=None)
+    pool.release("a")
+    second = pool.calibrate("a", source=None)
+    assert second is not first
+    assert second.calibrations == 1
+
+def test_analytics_pool_isolates_sessions():
+    pool = AnalyticsPool()
+
+    def session(session_id):
+        # Each session adds a distinct amount per turn, so any cross-talk shows up in the totals
+        step = int(session_id.split("-")[1]) % 2 + 1
+        analytics = pool.acquire(session_id)
+        for _ in range(TURNS):
+            pool.acquire(session_id).update_scores(technical=step)
+            pool.acquire(session_id).record_answer("Calm")
+        return session_id, step, analytics
+
+    for session_id, step, analytics in _hammer(session):
+        assert pool.acquire(session_id) is analytics
+        metrics = analytics.get_metrics()
+        assert metrics["questions_answered"] == TURNS
+        assert metrics["technical_score"] == min(100, step * TURNS)
+        assert metrics["behavioral_score"] == 0
+
+def test_pools_drop_idle_sessions_before_active_ones():
+    pool = AnalyticsPool(max_sessions=2, idle_timeout=0)
+    pool.acquire("old")
+    fresh = pool.acquire("new")
+    # With a zero idle timeout only the session just used survives
+    assert pool.acquire("new") is fresh
+    assert len(pool._sessions) == 1
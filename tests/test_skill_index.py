@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+import skill_index
+from skill_index import SkillIndex, alignment_method, build_index, skills_by_position
+
+@pytest.fixture
+def hashed(monkeypatch):
+    monkeypatch.setenv("SKILL_EMBEDDING_MODEL", "hashed")
+    monkeypatch.setattr(skill_index, "_embedder", None)
+
+def test_index_round_trip_is_memory_mapped(tmp_path, hashed):
+    info = build_index(str(tmp_path))
+    index = SkillIndex(str(tmp_path))
+    assert info["embedder"] == "hashed"
+    assert isinstance(index.embeddings, np.memmap)
+    assert len(index.rows) == info["skills"]
+    skill = skills_by_position[next(iter(skills_by_position))][0]
+    expected = skill_index.embed_texts([skill_index.skill_description(skill)])[0]
+    assert np.allclose(index.skill_matrix([skill])[0], expected)
+
+def test_hashed_scores_evidence_above_unrelated_answers(tmp_path, hashed):
+    build_index(str(tmp_path))
+    index = SkillIndex(str(tmp_path))
+    skills = ["Python", "SQL"]
+    relevant = index.score_answers(["I wrote Python services and tuned SQL queries for our reporting database."], skills)
+    unrelated = index.score_answers(["I enjoy hiking with my family on weekends."], skills)
+    assert relevant > 50
+    assert unrelated == 0.0
+
+def test_alignment_label_does_not_load_the_model(monkeypatch):
+    monkeypatch.setattr(skill_index, "_embedder", None)
+    monkeypatch.setenv("SKILL_EMBEDDING_MODEL", skill_index.SEMANTIC_EMBEDDING_MODEL)
+    assert alignment_method() == "semantic similarity"
+    assert skill_index._embedder is None
+    monkeypatch.setenv("SKILL_EMBEDDING_MODEL", "hashed")
+    assert alignment_method() == "keyword match"
@@ -0,0 +1,66 @@
+import time
+
+import speculation
+from speculation import SpeculativeResponder
+
+ANSWER = "I led the migration of our billing service to Kubernetes over six months"
+
+class StubStream:
+    """Stands in for stream_interview_turn: 20 tokens if it finishes, 5 if cancelled first"""
+    def __init__(self, seconds: float = 0.05):
+        self.seconds = seconds
+        self.cancel_events = []
+
+    def __call__(self, prompt, conversation_history, cancel_event):
+        self.cancel_events.append(cancel_event)
+        cancelled = cancel_event.wait(self.seconds)
+        return f"draft reply to: {prompt}", 5 if cancelled else 20, cancelled
+
+def eventually(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+def responder(monkeypatch, stream):
+    fresh_calls = []
+    monkeypatch.setattr(speculation, "stream_interview_turn", stream)
+    monkeypatch.setattr(speculation, "get_llm_response",
+                        lambda prompt, history: fresh_calls.append(prompt) or f"fresh reply to: {prompt}")
+    return SpeculativeResponder(lambda transcript: transcript), fresh_calls
+
+def test_close_final_transcript_reuses_the_draft(monkeypatch):
+    speculative, fresh_calls = responder(monkeypatch, StubStream())
+    speculative.on_partial(ANSWER)
+    reply = speculative.resolve(ANSWER + " in total")
+    assert reply == f"draft reply to: {ANSWER}"
+    assert fresh_calls == []
+    assert speculative.stats["hits"] == 1 and speculative.stats["misses"] == 0
+
+def test_different_final_transcript_gets_a_fresh_reply(monkeypatch):
+    stream = StubStream(seconds=5)
+    speculative, fresh_calls = responder(monkeypatch, stream)
+    speculative.on_partial(ANSWER)
+    final = "Actually my biggest project was a compiler for a small query language at university"
+    assert speculative.resolve(final) == f"fresh reply to: {final}"
+    assert fresh_calls == [final]
+    assert speculative.stats["misses"] == 1
+    assert eventually(lambda: stream.cancel_events) and stream.cancel_events[0].is_set()
+    assert eventually(lambda: speculative.stats["wasted_tokens"] == 5)
+
+def test_newer_partial_cancels_the_previous_draft(monkeypatch):
+    stream = StubStream(seconds=5)
+    speculative, _ = responder(monkeypatch, stream)
+    speculative.on_partial(ANSWER)
+    speculative.on_partial(ANSWER + " and then")
+    speculative.on_partial(ANSWER + " and then")  # same transcript, no new draft
+    assert speculative.stats["drafts"] == 2
+    assert eventually(lambda: len(stream.cancel_events) == 2)
+    assert stream.cancel_events[0].is_set() and not stream.cancel_events[1].is_set()
+    speculative.cancel()
+    assert eventually(lambda: speculative.stats["wasted_tokens"] == 10)
+
+def test_short_partials_do_not_start_drafts(monkeypatch):
+    speculative, _ = responder(monkeypatch, StubStream())
+    speculative.on_partial("I led the")
+    assert speculative.stats["drafts"] == 0
@@ -0,0 +1,20 @@
+import os
+import warnings
+
+import pytest
+import soundfile as sf
+import speech_recognition as sr
+
+from speech_utils import audio_energy
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "answer_three_phrases.wav")
+
+def test_audio_energy_matches_the_recognizer_scale():
+    samples, rate = sf.read(FIXTURE, dtype="int16")
+    audio = sr.AudioData(samples.tobytes(), rate, 2)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+    # energy_threshold is calibrated with audioop.rms, so silence detection needs the same scale
+    assert audio_energy(audio) == pytest.approx(audioop.rms(audio.frame_data, 2), abs=1)
+    assert audio_energy(sr.AudioData(b"", rate, 2)) == 0.0
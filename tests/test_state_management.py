@@ -0,0 +1,37 @@
+import types
+
+import llm_utils
+import state_management
+import transcript_compaction
+
+class SessionState(dict):
+    """Attribute and item access like st.session_state"""
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+def test_closing_a_question_keeps_the_interviewer_follow_up_open(tmp_path, monkeypatch):
+    session_state = SessionState(
+        messages=[
+            {"role": "assistant", "content": "Tell me about yourself."},
+            {"role": "user", "content": "I build data pipelines in Python."},
+            {"role": "assistant", "content": "Thanks. Which of those pipelines are you proudest of?"}
+        ],
+        current_question=1,
+        interview_questions={"questions": [{"category": "Introduction", "main_question": "Q0"},
+                                           {"category": "Introduction", "main_question": "Tell me about yourself."}]},
+        candidate_info={"name": "Ada", "position": "Engineer", "requirements": "Python"}
+    )
+    monkeypatch.setattr(state_management, "st", types.SimpleNamespace(session_state=session_state))
+    monkeypatch.setattr(transcript_compaction, "_store", transcript_compaction.SessionTranscriptStore(str(tmp_path)))
+    monkeypatch.setattr(llm_utils, "summarize_question_exchange", lambda *args: None)
+
+    state_management.close_current_question()
+    compactor = session_state.transcript_compactor
+    compactor.wait()
+
+    follow_up = {"role": "assistant", "content": "Thanks. Which of those pipelines are you proudest of?"}
+    assert session_state.messages == [follow_up]
+    assert state_management.get_conversation_history()[-1] == follow_up
+    # The closed exchange ends with the answer, so the follow-up is not stored twice
+    assert compactor.raw_messages()[-1]["role"] == "user"
+    assert compactor.records()[0]["exchange_count"] == 2
@@ -0,0 +1,52 @@
+import os
+import time
+
+import llm_utils
+from transcript_compaction import SessionTranscriptStore, TranscriptCompactor, fallback_summary
+
+def exchange(question, answer):
+    return [{"role": "assistant", "content": question}, {"role": "user", "content": answer}]
+
+def test_raw_messages_follow_question_order(tmp_path):
+    store = SessionTranscriptStore(str(tmp_path))
+    compactor = TranscriptCompactor("interview", ["Python"], store)
+    for index in (2, 0, 1):
+        store.append("interview", {"question_index": index, "question": f"Q{index}",
+                                   "messages": exchange(f"Q{index}", f"A{index}")})
+    assert [m["content"] for m in compactor.raw_messages()] == ["Q0", "A0", "Q1", "A1", "Q2", "A2"]
+
+def test_unanswered_question_skips_the_summary_call(tmp_path, monkeypatch):
+    calls = []
+    def summarize(question, messages, skills):
+        calls.append(question)
+        return {"key_claims": ["Uses Python daily"], "skills_evidenced": ["Python"], "score": 7}
+    monkeypatch.setattr(llm_utils, "summarize_question_exchange", summarize)
+    compactor = TranscriptCompactor("interview", ["Python"], SessionTranscriptStore(str(tmp_path)))
+    compactor.close_question(0, "Introduction", "Q0", exchange("Q0", "I use Python daily."))
+    compactor.close_question(1, "Introduction", "Q1", exchange("Q1", "  "))
+    records = compactor.wait()
+    assert calls == ["Q0"]
+    assert records[0]["score"] == 7 and records[1]["score"] is None
+
+def test_discard_removes_the_raw_transcript(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_utils, "summarize_question_exchange", lambda *args: None)
+    store = SessionTranscriptStore(str(tmp_path))
+    compactor = TranscriptCompactor("interview", [], store)
+    compactor.close_question(0, None, "Q0", exchange("Q0", "An answer."))
+    compactor.wait()
+    assert os.listdir(tmp_path)
+    compactor.discard()
+    # discard() deletes from a background thread
+    deadline = time.monotonic() + 5
+    while os.listdir(tmp_path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not os.listdir(tmp_path)
+
+def test_fallback_skills_match_whole_names_only():
+    skills = ["R", "SQL", "Git", "C", "C++", "C#", "Node.js"]
+    def evidenced(answer):
+        return fallback_summary([{"role": "user", "content": answer}], skills)["skills_evidenced"]
+    assert evidenced("Our project was a success after we migrated to a NoSQL store.") == []
+    assert evidenced("I did digital marketing before engineering.") == []
+    assert evidenced("I wrote C++ and some C#, plus R scripts against SQL.") == ["R", "SQL", "C++", "C#"]
+    assert evidenced("Deployed with git hooks and node.js") == ["Git", "Node.js"]
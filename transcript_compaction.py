@@ -0,0 +1,172 @@
+import gzip
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+DEFAULT_TRANSCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "session_transcripts")
+
+# Claims kept per question when the LLM summary is unavailable
+FALLBACK_CLAIMS = 3
+MAX_CLAIM_CHARS = 200
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="transcript-compaction")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+class SessionTranscriptStore:
+    """Raw per-session transcripts, appended as one gzip member per closed question"""
+    def __init__(self, root: str = DEFAULT_TRANSCRIPTS_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.root, f"{session_id}.jsonl.gz")
+
+    def append(self, session_id: str, entry: Dict[str, Any]):
+        """Append one closed question's raw exchange"""
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        with self._lock:
+            # Concatenated gzip members read back as a single stream
+            with open(self._path(session_id), "ab") as f:
+                f.write(gzip.compress(line))
+
+    def read(self, session_id: str) -> List[Dict[str, Any]]:
+        """All raw exchanges of a session, in the order they were closed"""
+        path = self._path(session_id)
+        if not os.path.exists(path):
+            return []
+        with self._lock, gzip.open(path, "rt", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def delete(self, session_id: str):
+        """Remove a session's raw transcript"""
+        with self._lock:
+            if os.path.exists(self._path(session_id)):
+                os.remove(self._path(session_id))
+
+def skill_pattern(skill: str) -> re.Pattern:
+    """Case-insensitive whole-word match for a skill name, including names like C++ or C#"""
+    # \b does not work next to symbols, so instead the name must not touch a word, + or # character
+    return re.compile(rf"(?<![\w+#]){re.escape(skill.strip())}(?![\w+#])", re.IGNORECASE)
+
+def fallback_summary(exchange: List[Dict[str, str]], skills: List[str]) -> Dict[str, Any]:
+    """Record built without the LLM: leading answer sentences and skill matches"""
+    answers = [m["content"] for m in exchange if m["role"] == "user"]
+    sentences = [s for answer in answers for s in _SENTENCE_END.split(answer.strip()) if s]
+    text = " ".join(answers)
+    return {
+        "key_claims": [s[:MAX_CLAIM_CHARS] for s in sentences[:FALLBACK_CLAIMS]],
+        "skills_evidenced": [skill for skill in skills if skill_pattern(skill).search(text)],
+        "score": None
+    }
+
+class TranscriptCompactor:
+    """Replaces closed questions' exchanges with structured records"""
+    def __init__(self, session_id: str, skills: List[str], store: Optional[SessionTranscriptStore] = None):
+        self.session_id = session_id
+        self.skills = skills
+        self.store = store or get_transcript_store()
+        self._records = []
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def close_question(self, question_index: int, category: Optional[str], question: Optional[str],
+                       exchange: List[Dict[str, str]]):
+        """Move a finished exchange to the session store and summarize it in the background"""
+        if not exchange:
+            return
+        exchange = [dict(m) for m in exchange]
+        record = {
+            "question_index": question_index,
+            "category": category,
+            "question": question,
+            "exchange_count": len(exchange),
+            "pending": True
+        }
+        # Readable placeholder until the LLM summary arrives
+        record.update(fallback_summary(exchange, self.skills))
+        with self._lock:
+            self._records.append(record)
+            self._pending[id(record)] = _executor.submit(self._compact, record, exchange)
+
+    def _compact(self, record: Dict[str, Any], exchange: List[Dict[str, str]]):
+        self.store.append(self.session_id, {
+            "question_index": record["question_index"],
+            "question": record["question"],
+            "messages": exchange
+        })
+        summary = None
+        # Without an answer there is nothing to summarize, so skip the LLM call
+        if any(m["role"] == "user" and m["content"].strip() for m in exchange):
+            try:
+                from llm_utils import summarize_question_exchange
+                summary = summarize_question_exchange(record["question"] or "", exchange, self.skills)
+            except Exception:
+                summary = None
+        with self._lock:
+            if summary:
+                record.update(summary)
+            record["pending"] = False
+            self._pending.pop(id(record), None)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Per-question records so far; pending ones carry fallback content"""
+        with self._lock:
+            return [dict(record) for record in self._records]
+
+    def wait(self, timeout: float = 30) -> List[Dict[str, Any]]:
+        """Wait for outstanding summaries, then return all records"""
+        with self._lock:
+            futures = list(self._pending.values())
+        for future in futures:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
+        return self.records()
+
+    def when_complete(self, callback, timeout: float = 60):
+        """Call callback(records) on a background thread once summaries are done"""
+        # A dedicated thread, so waiting never occupies a summarization worker
+        threading.Thread(target=lambda: callback(self.wait(timeout)), daemon=True).start()
+
+    def raw_messages(self) -> List[Dict[str, str]]:
+        """Full raw transcript of the closed questions from the session store"""
+        # Questions are appended by several compaction workers, so file order can differ
+        entries = sorted(self.store.read(self.session_id), key=lambda entry: entry["question_index"])
+        return [m for entry in entries for m in entry["messages"]]
+
+    def discard(self):
+        """Delete the raw transcript once summaries are done, e.g. after it has been archived"""
+        self.when_complete(lambda records: self.store.delete(self.session_id))
+
+    def context_message(self) -> Optional[Dict[str, str]]:
+        """Compact summary of earlier questions for the LLM context"""
+        records = self.records()
+        if not records:
+            return None
+        lines = []
+        for record in records:
+            claims = "; ".join(record["key_claims"]) or "no substantive answer"
+            skills = ", ".join(record["skills_evidenced"]) or "none"
+            lines.append(f"Q{record['question_index']} ({record['category']}): {record['question']} | "
+                         f"Claims: {claims} | Skills evidenced: {skills}")
+        return {"role": "system", "content": "Summary of earlier questions:\n" + "\n".join(lines)}
+
+    def answer_texts(self) -> List[str]:
+        """Condensed answers of closed questions, for scoring and conditioning"""
+        return [" ".join(record["key_claims"]) for record in self.records() if record["key_claims"]]
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_transcript_store(root: str = DEFAULT_TRANSCRIPTS_DIR) -> SessionTranscriptStore:
+    """Process-wide session transcript store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionTranscriptStore(root)
+        return _store
@@ -1,15 +1,45 @@
 import streamlit as st
-from gtts import gTTS
-from playsound import playsound
+import io
 import os
 
 def text_to_speech(text):
+    """Convert text to speech and play it where the candidate is"""
+    from config import get_config
+    if get_config().audio_capture == "browser":
+        return text_to_speech_browser(text)
+    return text_to_speech_local(text)
+
+def text_to_speech_browser(text):
+    """Convert text to speech and send it to the candidate's browser"""
+    try:
+        if not text or len(text.strip()) == 0:
+            raise ValueError("Empty text provided for speech conversion")
+        
+        from gtts import gTTS
+        mp3 = io.BytesIO()
+        gTTS(text=text, lang='en').write_to_fp(mp3)
+        
+        from audio_processing import get_audio_pool, BROWSER_FORMATS
+        try:
+            # Transcoding runs in the audio worker pool; fall back to the MP3 if it fails
+            data = get_audio_pool().prepare_for_browser(mp3.getvalue(), "opus")
+            mime = BROWSER_FORMATS["opus"][2]
+        except Exception:
+            data, mime = mp3.getvalue(), BROWSER_FORMATS["mp3"][2]
+        st.audio(data, format=mime)
+    except Exception as e:
+        st.error(f"Error in text-to-speech: {str(e)}")
+
+def text_to_speech_local(text):
     """Convert text to speech and play it"""
     audio_file = "response.mp3"
     try:
         if not text or len(text.strip()) == 0:
             raise ValueError("Empty text provided for speech conversion")
             
+        # Imported on first use to keep app startup fast
+        from gtts import gTTS
+        from playsound import playsound
         tts = gTTS(text=text, lang='en')
         tts.save(audio_file)
         playsound(audio_file)
@@ -77,36 +77,77 @@ def display_sidebar_controls():
     st.sidebar.markdown("### Interview Controls 🎛️")
     return st.sidebar.button("🔄 Reset Interview", help="Click to start over", key="reset_button")
 
-def display_analytics(analytics):
-    """Display analytics in the sidebar"""
+def display_analytics(analytics, alignment_method="keyword match"):
+    """Display analytics in the sidebar from a precomputed snapshot"""
+    # Aggregates and strings are derived when an answer is recorded, not here
     st.sidebar.markdown("### Real-time Analytics 📊")
     
     # Emotion Tracking
     st.sidebar.markdown("#### Current Emotion 😊")
-    if analytics["emotion"]:
-        current_emotion = analytics["emotion"][-1]
-        st.sidebar.info(f"Current Emotion: {current_emotion}")
+    if analytics["current_emotion"]:
+        st.sidebar.info(f"Current Emotion: {analytics['current_emotion']}")
     
     # Performance Metrics
     st.sidebar.markdown("#### Performance Metrics 📈")
+    moving_average = analytics["moving_average"]
     col1, col2 = st.sidebar.columns(2)
     with col1:
-        st.metric("Technical", f"{analytics['technical_score']}%")
-        st.metric("Communication", f"{analytics['communication_score']}%")
+        st.metric("Technical", f"{analytics['technical_score']}%", delta=moving_average['technical_score'], help="Delta: average points gained per answer over the last few answers")
+        st.metric("Communication", f"{analytics['communication_score']}%", delta=moving_average['communication_score'], help="Delta: average points gained per answer over the last few answers")
     with col2:
-        st.metric("Behavioral", f"{analytics['behavioral_score']}%")
-        st.metric("Confidence", f"{analytics['confidence_score']}%")
+        st.metric("Behavioral", f"{analytics['behavioral_score']}%", delta=moving_average['behavioral_score'], help="Delta: average points gained per answer over the last few answers")
+        st.metric("Confidence", f"{analytics['confidence_score']}%", delta=moving_average['confidence_score'], help="Delta: average points gained per answer over the last few answers")
+    if analytics["questions_answered"] > 1:
+        st.sidebar.caption(f"Gain trend: {analytics['trend']:+} points per answer (positive means later answers gain more)")
     
     # Experience Alignment
     st.sidebar.markdown("#### Job Fit Analysis 🎯")
     st.sidebar.progress(analytics["experience_alignment"] / 100)
-    st.sidebar.caption(f"Experience Alignment: {analytics['experience_alignment']}%")
+    st.sidebar.caption(f"Experience Alignment ({alignment_method} against selected skills): {analytics['experience_alignment']}%")
     
     # Emotion History
-    if analytics["emotion"]:
+    if analytics["emotion_timeline"]:
         st.sidebar.markdown("#### Emotion Timeline 📋")
-        emotion_history = ", ".join(analytics["emotion"])
-        st.sidebar.caption(f"Emotion Progress: {emotion_history}")
+        st.sidebar.caption(f"Emotion Progress: {analytics['emotion_timeline']}")
+
+def display_analytics_export(data, file_name):
+    """Offer the per-interview analytics as a Parquet download"""
+    if data:
+        st.sidebar.download_button(
+            "⬇️ Export Analytics (Parquet)",
+            data=data,
+            file_name=file_name,
+            mime="application/vnd.apache.parquet",
+            key="analytics_export"
+        )
+
+def display_speculation_stats(stats):
+    """Display how often drafted replies were reused"""
+    speculated = stats["hits"] + stats["misses"]
+    if speculated:
+        st.sidebar.caption(
+            f"Reply prefetch: {stats['hits'] / speculated:.0%} hit rate, "
+            f"{stats['seconds_saved']:.1f}s saved, {stats['wasted_tokens']} wasted tokens"
+        )
+
+def display_cache_stats(cache):
+    """Display how many replies were served without an LLM call"""
+    served = cache.stats["hits"] + cache.stats["stock_hits"]
+    if served:
+        st.sidebar.caption(
+            f"Reply cache: {cache.hit_ratio():.0%} hit rate "
+            f"({cache.stats['stock_hits']} answered locally), {cache.stats['seconds_saved']:.1f}s saved"
+        )
+
+def display_prompt_stats(stats):
+    """Display prompt size, prefix reuse and processing latency per template"""
+    for name, template_stats in stats.items():
+        latency = template_stats["avg_prompt_ms"]
+        st.sidebar.caption(
+            f"Prompt {template_stats['version']}: {template_stats['avg_prompt_tokens']:.0f} tokens avg "
+            f"(~{template_stats['prefix_tokens']} fixed prefix, {template_stats['cached_ratio']:.0%} cached)"
+            + (f", {latency:.0f} ms processing" if latency is not None else "")
+        )
 
 def display_help_section():
     """Display help and instructions in the sidebar"""